@@ -0,0 +1,188 @@
+"""
+contains the active-set sampling of the continuous families of rigid motions
+of a convex shape: the optimisation starts with a coarse set of the members,
+after every round the members locally maximising the length inside
+of the best curve are found by local maximisations over the parameters
+of the motions and added to the active set,
+the parameters of a member are the rows (angle, x shift, y shift)
+of the rotations and shifts of the ShapeFamily,
+a MotionFamily consists of the base shape and the 3x2 array
+of the bounds of the parameters (equal for the fixed parameters)
+"""
+import collections
+import numpy
+import scipy.optimize
+
+import optimisation_data_generators as odg
+import shape_families as sf
+
+MotionFamily = collections.namedtuple(
+    'MotionFamily', ['base_shape', 'bounds'])
+
+ActiveSetRound = collections.namedtuple(
+    'ActiveSetRound',
+    ['shape_family', 'opt_data', 'point_array',
+     'worst_parameters', 'worst_len'])
+
+
+def get_grid_parameters(in_bounds, in_point_nums):
+    """
+    returns the parameters of the grid with in_point_nums[k] points
+    in the centres of the equal cells of the k-th row of in_bounds (3x2)
+    """
+    bounds = numpy.asarray(in_bounds, dtype=float)
+    return numpy.stack(numpy.meshgrid(
+        *[_b[0]+(numpy.arange(_n)+0.5)*(_b[1]-_b[0])/_n
+          for (_b, _n) in zip(bounds, in_point_nums)],
+        indexing='ij'), axis=-1).reshape(-1, len(bounds))
+
+
+def get_shape_family(in_base_shape, in_parameters):
+    """
+    returns the ShapeFamily of in_base_shape
+    with the members given by the rows of in_parameters
+    """
+    parameters = numpy.asarray(in_parameters, dtype=float).reshape(-1, 3)
+    return sf.ShapeFamily(in_base_shape, parameters[:, 0], parameters[:, 1:])
+
+
+def get_len_inside_array(
+        in_base_shape, in_point_array, in_parameters, iter_limit=10):
+    """
+    returns the lengths of the (extended) curve given by the Nx2 array
+    in_point_array inside the members given by the rows of in_parameters
+    """
+    return get_shape_family(
+        in_base_shape, in_parameters).get_max_len_inside_array(
+            in_point_array, iter_limit)
+
+
+def _get_initial_simplex(in_start, in_bounds, in_step_fraction):
+    steps = in_step_fraction*(in_bounds[:, 1]-in_bounds[:, 0])
+    steps = numpy.where(in_start+steps <= in_bounds[:, 1], steps, -steps)
+    return numpy.concatenate(
+        (in_start[numpy.newaxis], in_start+numpy.diag(steps)))
+
+
+def _maximise_locally(in_motion_family, in_point_array, in_start, **kwargs):
+    bounds = numpy.asarray(in_motion_family.bounds, dtype=float)
+    free_mask = bounds[:, 0] < bounds[:, 1]
+    res = in_start.copy()
+
+    def neg_len(in_free):
+        res[free_mask] = in_free
+        return -get_len_inside_array(
+            in_motion_family.base_shape, in_point_array, res,
+            kwargs.get('iter_limit', 10))[0]
+    opt_res = scipy.optimize.minimize(
+        neg_len, in_start[free_mask],
+        method='Nelder-Mead', bounds=bounds[free_mask],
+        options={
+            'initial_simplex': _get_initial_simplex(
+                in_start[free_mask], bounds[free_mask],
+                kwargs.get('step_fraction', 0.05)),
+            'xatol': kwargs.get('xatol', 1e-6)})
+    res[free_mask] = opt_res.x
+    return res, -opt_res.fun
+
+
+def find_local_maxima(
+        in_motion_family, in_point_array, in_start_parameters, **kwargs):
+    """
+    returns the parameters of the members of in_motion_family
+    locally maximising the length inside of the curve given by in_point_array
+    and the array of these lengths, the local maximisations over
+    the parameters with different bounds start from kwargs['start_num'] (5)
+    rows of in_start_parameters with the longest lengths inside,
+    kwargs: iter_limit (10), step_fraction (0.05) and xatol (1e-6)
+    """
+    start_parameters = numpy.asarray(
+        in_start_parameters, dtype=float).reshape(-1, 3)
+    start_lens = get_len_inside_array(
+        in_motion_family.base_shape, in_point_array, start_parameters,
+        kwargs.get('iter_limit', 10))
+    start_nums = numpy.argsort(-start_lens)[:kwargs.get('start_num', 5)]
+    res_parameters = start_parameters[start_nums]
+    res_lens = start_lens[start_nums]
+    for res_num in range(len(start_nums)):
+        cur_parameters, cur_len = _maximise_locally(
+            in_motion_family, in_point_array, res_parameters[res_num],
+            **kwargs)
+        if cur_len > res_lens[res_num]:
+            res_parameters[res_num], res_lens[res_num] = \
+                cur_parameters, cur_len
+    return res_parameters, res_lens
+
+
+def find_worst_parameters(
+        in_motion_family, in_point_array, in_start_parameters, **kwargs):
+    """
+    returns the parameters of the member of in_motion_family
+    maximising the length inside of the curve given by in_point_array
+    and this length (cf. find_local_maxima)
+    """
+    res_parameters, res_lens = find_local_maxima(
+        in_motion_family, in_point_array, in_start_parameters, **kwargs)
+    return res_parameters[res_lens.argmax()], res_lens.max()
+
+
+def _get_new_parameters(in_round, in_max_parameters, in_max_lens, **kwargs):
+    active_max = in_round.shape_family.get_max_len_inside_array(
+        in_round.point_array, kwargs.get('iter_limit', 10)).max()
+    return numpy.unique(
+        in_max_parameters[in_max_lens > active_max+kwargs.get('tol', 1e-6)],
+        axis=0)
+
+
+def generate_active_set_data(
+        in_run_round_fun, in_representation, in_motion_family,
+        in_initial_parameters, in_round_num, **kwargs):
+    """
+    returns the list of the ActiveSetRound objects of at most in_round_num
+    rounds, the optimisation data of a round is
+    in_run_round_fun(shape_family, x0, round_num), where x0 is None
+    at the first round and the best data of the previous round otherwise,
+    after every round the local maxima of the length inside of the best curve
+    (cf. find_local_maxima) exceeding the maximum over the active set
+    by more than kwargs['tol'] (1e-6) are added to the active set,
+    the searches start from the active members
+    and the rows of kwargs['probe_parameters'],
+    the rounds stop when no member is added,
+    the times of every round are shifted by the end time of the previous one
+    """
+    active_parameters = numpy.asarray(
+        in_initial_parameters, dtype=float).reshape(-1, 3)
+    res = []
+    for round_num in range(in_round_num):
+        shape_family = get_shape_family(
+            in_motion_family.base_shape, active_parameters)
+        opt_data = in_run_round_fun(
+            shape_family, res[-1].opt_data[-1].data if res else None,
+            round_num)
+        if res:
+            opt_data = odg.shift_time(opt_data, res[-1].opt_data[-1].time)
+        point_array = in_representation.to_curves_batch(
+            [opt_data[-1].data])[0]
+        max_parameters, max_lens = find_local_maxima(
+            in_motion_family, point_array,
+            numpy.concatenate((
+                active_parameters,
+                numpy.reshape(
+                    kwargs.get('probe_parameters', numpy.zeros((0, 3))),
+                    (-1, 3)))),
+            **kwargs)
+        res.append(ActiveSetRound(
+            shape_family, opt_data, point_array,
+            max_parameters[max_lens.argmax()], max_lens.max()))
+        new_parameters = _get_new_parameters(
+            res[-1], max_parameters, max_lens, **kwargs)
+        if len(new_parameters) == 0:
+            break
+        active_parameters = numpy.concatenate(
+            (active_parameters, new_parameters))
+    return res
+
+
+def get_best_round(in_round_list):
+    """returns the round with the shortest worst length inside"""
+    return min(in_round_list, key=lambda x: x.worst_len)
@@ -1,5 +1,11 @@
 """
 defines classes representing convex shapes in 2d
+
+the shapes implement the method contains_many checking many points at once,
+the method find_exit_parameter allowing to compute
+the exact intersection of a ray starting inside of the shape
+with its boundary and the method get_outward_normals
+returning the normals at the boundary points
 """
 import numpy
 
@@ -18,6 +24,35 @@ class Wheel:  # pylint: disable=too-few-public-methods
     def __contains__(self, in_pos):
         return norm_sq(in_pos-self.center) <= self._radius_sq
 
+    def contains_many(self, in_points):
+        """
+        returns the boolean mask of the points of the ...x2 array in_points
+        which are inside
+        """
+        rel_points = numpy.subtract(in_points, self.center)
+        return numpy.sum(rel_points*rel_points, axis=-1) <= self._radius_sq
+
+    def find_exit_parameter(self, in_pos, in_direction):
+        """
+        returns the largest t such that in_pos+t*in_direction is inside,
+        in_pos has to be inside,
+        the leading dimensions of the inputs are treated as batch dimensions
+        """
+        rel_pos = numpy.subtract(in_pos, self.center)
+        direction = numpy.asarray(in_direction)
+        quad_a = numpy.sum(direction*direction, axis=-1)
+        half_b = numpy.sum(rel_pos*direction, axis=-1)
+        quad_c = numpy.sum(rel_pos*rel_pos, axis=-1)-self._radius_sq
+        return (-half_b+numpy.sqrt(
+            numpy.maximum(half_b**2-quad_a*quad_c, 0)))/quad_a
+
+    def get_outward_normals(self, in_points):
+        """
+        returns the (not normalised) outward normals
+        at the boundary points of the ...x2 array in_points
+        """
+        return numpy.subtract(in_points, self.center)
+
 
 class Rectangle:  # pylint: disable=too-few-public-methods
     """represents a rectangle"""
@@ -30,3 +65,88 @@ class Rectangle:  # pylint: disable=too-few-public-methods
         tmp_pos = in_pos-self.center
         return abs(tmp_pos[0]) <= self.width/2 and \
             abs(tmp_pos[1]) <= self.height/2
+
+    def contains_many(self, in_points):
+        """
+        returns the boolean mask of the points of the ...x2 array in_points
+        which are inside
+        """
+        rel_points = numpy.abs(numpy.subtract(in_points, self.center))
+        return (rel_points[..., 0] <= self.width/2) & \
+            (rel_points[..., 1] <= self.height/2)
+
+    def find_exit_parameter(self, in_pos, in_direction):
+        """
+        returns the largest t such that in_pos+t*in_direction is inside,
+        in_pos has to be inside,
+        the leading dimensions of the inputs are treated as batch dimensions
+        """
+        half_size = numpy.array([self.width, self.height])/2
+        rel_pos = numpy.subtract(in_pos, self.center)
+        direction = numpy.asarray(in_direction)
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            axis_params = numpy.where(
+                direction == 0,
+                numpy.inf,
+                (numpy.copysign(half_size, direction)-rel_pos)/direction)
+        return numpy.min(axis_params, axis=-1)
+
+    def get_outward_normals(self, in_points):
+        """
+        returns the outward normals of the sides containing
+        the boundary points of the ...x2 array in_points
+        """
+        half_size = numpy.array([self.width, self.height])/2
+        rel_pos = numpy.subtract(in_points, self.center)
+        side_mask = numpy.abs(rel_pos)/half_size
+        side_mask = side_mask == side_mask.max(axis=-1, keepdims=True)
+        side_mask[..., 1] &= ~side_mask[..., 0]
+        return numpy.where(side_mask, numpy.sign(rel_pos), 0.0)
+
+
+class Slab:
+    """
+    represents the set {x: in_lower <= x.in_normal <= in_upper},
+    in_lower can be -inf (half-plane)
+    """
+    def __init__(self, in_normal, in_lower, in_upper):
+        self.normal = numpy.asarray(in_normal, dtype=float)
+        self.lower = in_lower
+        self.upper = in_upper
+
+    def __contains__(self, in_pos):
+        return self.lower <= numpy.dot(in_pos, self.normal) <= self.upper
+
+    def contains_many(self, in_points):
+        """
+        returns the boolean mask of the points of the ...x2 array in_points
+        which are inside
+        """
+        projections = numpy.asarray(in_points, dtype=float) @ self.normal
+        return (self.lower <= projections) & (projections <= self.upper)
+
+    def find_exit_parameter(self, in_pos, in_direction):
+        """
+        returns the largest t such that in_pos+t*in_direction is inside
+        (inf for the directions parallel to the boundary),
+        in_pos has to be inside,
+        the leading dimensions of the inputs are treated as batch dimensions
+        """
+        dir_projections = numpy.asarray(in_direction, dtype=float) @ self.normal
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            return numpy.where(
+                dir_projections == 0,
+                numpy.inf,
+                (numpy.where(dir_projections > 0, self.upper, self.lower) -
+                 numpy.asarray(in_pos, dtype=float) @ self.normal) /
+                dir_projections)
+
+    def get_outward_normals(self, in_points):
+        """
+        returns the outward normals at the boundary points
+        of the ...x2 array in_points
+        """
+        projections = numpy.asarray(in_points, dtype=float) @ self.normal
+        return numpy.where(
+            (projections >= (self.lower+self.upper)/2)[..., numpy.newaxis],
+            self.normal, -self.normal)
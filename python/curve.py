@@ -7,34 +7,89 @@ import copy
 import numpy
 
 
+def shifts_to_points(in_shift_array, in_start_pos=(0.0, 0.0)):
+    """
+    returns the array of points of the zig-zag curve starting at in_start_pos
+    and consisting of the segments given by in_shift_array,
+    all leading dimensions of in_shift_array (of shape ...xNx2)
+    are treated as batch dimensions
+    """
+    shift_array = numpy.asarray(in_shift_array, dtype=float)
+    if shift_array.ndim < 2:
+        shift_array = shift_array.reshape(-1, 2)
+    res = numpy.empty(
+        shift_array.shape[:-2]+(shift_array.shape[-2]+1, 2))
+    res[..., 0, :] = in_start_pos
+    numpy.cumsum(shift_array, axis=-2, out=res[..., 1:, :])
+    res[..., 1:, :] += in_start_pos
+    return res
+
+
 def angles_to_points_logo(
-        in_angle_list, in_segment_size, in_start_pos=numpy.array([0.0, 0.0])):
+        in_angle_list, in_segment_size, in_start_pos=(0.0, 0.0)):
     """
-    returns the list of points as in "logo-curve"
+    returns the array of points as in "logo-curve",
+    the last axis of in_angle_list enumerates the angles
     """
-    cur_angle = 0
-    point_list = [copy.deepcopy(in_start_pos)]
-    cur_pos = copy.deepcopy(in_start_pos)
-    for _ in in_angle_list:
-        cur_angle += _
-        cur_pos += in_segment_size*numpy.array(
-            [numpy.cos(cur_angle), numpy.sin(cur_angle)])
-        point_list.append(copy.deepcopy(cur_pos))
-    return point_list
+    return angles_to_points_azimuth(
+        numpy.cumsum(in_angle_list, axis=-1), in_segment_size, in_start_pos)
 
 
 def angles_to_points_azimuth(
-        in_angle_list, in_segment_size, in_start_pos=numpy.array([0.0, 0.0])):
+        in_angle_list, in_segment_size, in_start_pos=(0.0, 0.0)):
+    """
+    returns the array of points as in "azimuth-curve",
+    the last axis of in_angle_list enumerates the angles
+    """
+    angle_array = numpy.asarray(in_angle_list, dtype=float)
+    return shifts_to_points(
+        in_segment_size*numpy.stack(
+            (numpy.cos(angle_array), numpy.sin(angle_array)), axis=-1),
+        in_start_pos)
+
+
+def _reverse_cumsum(in_array, in_axis):
+    return numpy.flip(
+        numpy.cumsum(numpy.flip(in_array, axis=in_axis), axis=in_axis),
+        axis=in_axis)
+
+
+def shifts_to_points_gradient(in_point_gradient):
+    """
+    returns the gradient with respect to the shifts of a function
+    of the points returned by shifts_to_points
+    given its gradient in_point_gradient with respect to the points
+    """
+    return _reverse_cumsum(
+        numpy.asarray(in_point_gradient, dtype=float)[..., 1:, :], -2)
+
+
+def angles_to_points_azimuth_gradient(
+        in_angle_list, in_segment_size, in_point_gradient):
+    """
+    returns the gradient with respect to the angles of a function
+    of the points returned by angles_to_points_azimuth
+    given its gradient in_point_gradient with respect to the points
     """
-    returns the list of points as in "azimuth-curve"
+    angle_array = numpy.asarray(in_angle_list, dtype=float)
+    shift_gradient = shifts_to_points_gradient(in_point_gradient)
+    return in_segment_size*(
+        numpy.cos(angle_array)*shift_gradient[..., 1] -
+        numpy.sin(angle_array)*shift_gradient[..., 0])
+
+
+def angles_to_points_logo_gradient(
+        in_angle_list, in_segment_size, in_point_gradient):
+    """
+    returns the gradient with respect to the angles of a function
+    of the points returned by angles_to_points_logo
+    given its gradient in_point_gradient with respect to the points
     """
-    point_list = [copy.deepcopy(in_start_pos)]
-    cur_pos = copy.deepcopy(in_start_pos)
-    for cur_angle in in_angle_list:
-        cur_pos += in_segment_size*numpy.array(
-            [numpy.cos(cur_angle), numpy.sin(cur_angle)])
-        point_list.append(copy.deepcopy(cur_pos))
-    return point_list
+    return _reverse_cumsum(
+        angles_to_points_azimuth_gradient(
+            numpy.cumsum(in_angle_list, axis=-1),
+            in_segment_size, in_point_gradient),
+        -1)
 
 
 def logo_agnles_to_azimuth_angles(in_logo_angles):
@@ -50,35 +105,59 @@ def logo_agnles_to_azimuth_angles(in_logo_angles):
 
 
 class _AbstractCurve:
-    _point_list = []
+    _point_array = numpy.zeros((0, 2))
 
     @property
     def point_list(self):
-        """returns potins of the curve in order"""
-        return self._point_list
+        """returns potins of the curve in order as a Nx2 array"""
+        return self._point_array
 
     @property
     def x_list(self):
-        """returns the x-coordinates of point_list"""
-        return tuple(_[0] for _ in self.point_list)
+        """returns the x-coordinates of point_list (view, no copy)"""
+        return self._point_array[:, 0]
 
     @property
     def y_list(self):
-        """returns the y-coordinates of point_list"""
-        return tuple(_[1] for _ in self.point_list)
+        """returns the y-coordinates of point_list (view, no copy)"""
+        return self._point_array[:, 1]
 
 
-def get_angle_curve_class(in_to_point_list_fun):
-    """returns an AngleCurve class"""
+def get_angle_curve_class(in_to_point_list_fun, in_gradient_fun=None):
+    """
+    returns an AngleCurve class,
+    in_gradient_fun (if given) transforms the gradients with respect
+    to the points into the gradients with respect to the angles
+    """
     class AngleCurve(_AbstractCurve):
         """
         represents a curve
         """
         def __init__(self, in_angle_list, in_segment_size):
             self._angle_list = copy.deepcopy(in_angle_list)
-            self._point_list = in_to_point_list_fun(
+            self._point_array = in_to_point_list_fun(
                 self._angle_list, in_segment_size)
 
+        @staticmethod
+        def angles_to_points(in_angle_data, in_segment_size):
+            """
+            returns the points of the curve(s) given by in_angle_data,
+            the leading dimensions of in_angle_data are batch dimensions
+            """
+            return in_to_point_list_fun(in_angle_data, in_segment_size)
+
+        @staticmethod
+        def angles_to_points_gradient(
+                in_angle_data, in_segment_size, in_point_gradient):
+            """
+            returns the gradient with respect to in_angle_data
+            of a function of the points of the curve
+            given its gradient in_point_gradient with respect to the points
+            """
+            assert in_gradient_fun is not None
+            return in_gradient_fun(
+                in_angle_data, in_segment_size, in_point_gradient)
+
         @property
         def angle_list(self):
             """returns the angle_list"""
@@ -87,14 +166,17 @@ def get_angle_curve_class(in_to_point_list_fun):
     return AngleCurve
 
 
-LogoCurve = get_angle_curve_class(angles_to_points_logo)
-AzimuthCurve = get_angle_curve_class(angles_to_points_azimuth)
+LogoCurve = get_angle_curve_class(
+    angles_to_points_logo, angles_to_points_logo_gradient)
+AzimuthCurve = get_angle_curve_class(
+    angles_to_points_azimuth, angles_to_points_azimuth_gradient)
 
 
 class PointCurve(_AbstractCurve):
     """represetns a zig-zag-curvestarting at the point (0, 0)"""
     def __init__(self, in_point_list):
-        self._point_list = [numpy.array([0, 0])]+in_point_list
+        self._point_array = numpy.concatenate(
+            (numpy.zeros((1, 2)), numpy.reshape(in_point_list, (-1, 2))))
 
 
 class ShiftCurve(_AbstractCurve):
@@ -103,8 +185,4 @@ class ShiftCurve(_AbstractCurve):
     generated from a list of shifts
     """
     def __init__(self, in_shift_list):
-        self._point_list = [numpy.array([0.0, 0.0])]
-        cur_pos = numpy.array([0.0, 0.0])
-        for cur_shift in in_shift_list:
-            cur_pos += cur_shift
-            self._point_list.append(cur_pos)
+        self._point_array = shifts_to_points(in_shift_list)
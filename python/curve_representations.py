@@ -2,15 +2,32 @@
 contains utilities to cast list of numbers into a curve
 """
 import numpy
+import curve
 import escape_curve
 
 
+def _to_data_matrix(in_data_matrix, in_data_size):
+    res = numpy.asarray(in_data_matrix, dtype=float)
+    assert res.ndim == 2 and res.shape[1] == in_data_size
+    return res
+
+
+def _get_bounds(in_data_size, in_min_val, in_max_val):
+    return list(zip(
+        numpy.broadcast_to(in_min_val, (in_data_size,)).tolist(),
+        numpy.broadcast_to(in_max_val, (in_data_size,)).tolist()))
+
+
 class PointCurveRepresentation:
-    """allows to cast list of numbers into PointCurve"""
+    """
+    allows to cast list of numbers into PointCurve,
+    min_val and max_val are numbers or the arrays of the bounds
+    of every coordinate
+    """
     def __init__(self, in_data_size, min_val, max_val):
         assert in_data_size % 2 == 0
         self._data_size = in_data_size
-        self._bounds = [(min_val, max_val) for _ in range(in_data_size)]
+        self._bounds = _get_bounds(in_data_size, min_val, max_val)
 
     @property
     def bounds(self):
@@ -24,6 +41,33 @@ class PointCurveRepresentation:
             numpy.array(in_data[_:_+2]) for _ in range(0, self._data_size, 2)]
         return escape_curve.PointCurve(point_list)
 
+    def to_curves_batch(self, in_data_matrix):
+        """
+        returns the MxNx2 array of the points of the curves
+        represented by the rows of in_data_matrix
+        """
+        data_matrix = _to_data_matrix(in_data_matrix, self._data_size)
+        return numpy.concatenate(
+            (numpy.zeros((len(data_matrix), 1, 2)),
+             data_matrix.reshape(len(data_matrix), -1, 2)),
+            axis=1)
+
+    def get_data_gradient(self, in_data, in_point_gradient):
+        """
+        returns the gradient with respect to in_data of a function
+        of the points of the represented curve
+        given its gradient in_point_gradient with respect to the points
+        """
+        assert len(in_data) == self._data_size
+        return numpy.asarray(in_point_gradient, dtype=float)[1:].ravel()
+
+    def get_first_changed_point(self, in_data_num):
+        """
+        returns the index of the first point of the represented curve
+        moved by the change of the data from the index in_data_num on
+        """
+        return in_data_num//2+1
+
 
 class ShiftCurveRepresentation:
     """allows to cast list of numbers into ShiftCurve"""
@@ -44,6 +88,31 @@ class ShiftCurveRepresentation:
             numpy.array(in_data[_:_+2]) for _ in range(0, self._data_size, 2)]
         return escape_curve.ShiftCurve(shift_list)
 
+    def to_curves_batch(self, in_data_matrix):
+        """
+        returns the MxNx2 array of the points of the curves
+        represented by the rows of in_data_matrix
+        """
+        data_matrix = _to_data_matrix(in_data_matrix, self._data_size)
+        return curve.shifts_to_points(
+            data_matrix.reshape(len(data_matrix), -1, 2))
+
+    def get_data_gradient(self, in_data, in_point_gradient):
+        """
+        returns the gradient with respect to in_data of a function
+        of the points of the represented curve
+        given its gradient in_point_gradient with respect to the points
+        """
+        assert len(in_data) == self._data_size
+        return curve.shifts_to_points_gradient(in_point_gradient).ravel()
+
+    def get_first_changed_point(self, in_data_num):
+        """
+        returns the index of the first point of the represented curve
+        moved by the change of the data from the index in_data_num on
+        """
+        return in_data_num//2+1
+
 
 def get_angle_curve_data_representation(in_curve_class):
     """returns a class allowing to cast a list of points into an AngleCurve"""
@@ -65,6 +134,32 @@ def get_angle_curve_data_representation(in_curve_class):
             assert len(in_angle_data) == self._data_size
             return in_curve_class(in_angle_data, self._segment_size)
 
+        def to_curves_batch(self, in_angle_data_matrix):
+            """
+            returns the MxNx2 array of the points of the curves
+            represented by the rows of in_angle_data_matrix
+            """
+            return in_curve_class.angles_to_points(
+                _to_data_matrix(in_angle_data_matrix, self._data_size),
+                self._segment_size)
+
+        def get_data_gradient(self, in_angle_data, in_point_gradient):
+            """
+            returns the gradient with respect to in_angle_data
+            of a function of the points of the represented curve
+            given its gradient in_point_gradient with respect to the points
+            """
+            assert len(in_angle_data) == self._data_size
+            return in_curve_class.angles_to_points_gradient(
+                in_angle_data, self._segment_size, in_point_gradient)
+
+        def get_first_changed_point(self, in_data_num):
+            """
+            returns the index of the first point of the represented curve
+            moved by the change of the data from the index in_data_num on
+            """
+            return in_data_num+1
+
     return AngleCurveRepresentation
 
 
@@ -95,9 +190,44 @@ def get_angle_curve_fixed_data_representation(in_curve_class):
             angle_list = numpy.insert(in_angle_data, 0, 0, axis=0)
             return in_curve_class(angle_list, self._segment_size)
 
+        def to_curves_batch(self, in_angle_data_matrix):
+            """
+            returns the MxNx2 array of the points of the curves
+            represented by the rows of in_angle_data_matrix
+            """
+            angle_matrix = numpy.insert(
+                _to_data_matrix(in_angle_data_matrix, self._data_size),
+                0, 0, axis=1)
+            return in_curve_class.angles_to_points(
+                angle_matrix, self._segment_size)
+
+        def get_data_gradient(self, in_angle_data, in_point_gradient):
+            """
+            returns the gradient with respect to in_angle_data
+            of a function of the points of the represented curve
+            given its gradient in_point_gradient with respect to the points
+            """
+            assert len(in_angle_data) == self._data_size
+            return in_curve_class.angles_to_points_gradient(
+                numpy.insert(in_angle_data, 0, 0, axis=0),
+                self._segment_size, in_point_gradient)[1:]
+
+        def get_first_changed_point(self, in_data_num):
+            """
+            returns the index of the first point of the represented curve
+            moved by the change of the data from the index in_data_num on
+            """
+            return in_data_num+2
+
     return AngleCurveFixedRepresentation
 
 
+def _set_class_name(in_class, in_name):
+    """allows to pickle the instances of the classes created by the factories"""
+    in_class.__name__ = in_name
+    in_class.__qualname__ = in_name
+
+
 LogoRepresentation = \
     get_angle_curve_data_representation(escape_curve.LogoCurve)
 AzimuthRepresentation = \
@@ -107,3 +237,8 @@ LogoRepresentationFix = \
     get_angle_curve_fixed_data_representation(escape_curve.LogoCurve)
 AzimuthRepresentationFix = \
     get_angle_curve_fixed_data_representation(escape_curve.AzimuthCurve)
+
+_set_class_name(LogoRepresentation, 'LogoRepresentation')
+_set_class_name(AzimuthRepresentation, 'AzimuthRepresentation')
+_set_class_name(LogoRepresentationFix, 'LogoRepresentationFix')
+_set_class_name(AzimuthRepresentationFix, 'AzimuthRepresentationFix')
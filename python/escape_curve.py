@@ -1,16 +1,27 @@
 """contains a definition of the function get_curve_class"""
 
+import collections
 import copy
 import numpy.linalg
 
 import extendable_curve
 
+EscapeState = collections.namedtuple(
+    'EscapeState',
+    ['point_array', 'dist_array', 'first_outside', 'len_array', 'iter_limit'])
+
 
 def find_distance_to_boundary(pos_in, pos_out, convex_set, iter_limit):
     """
     returns the distance between the pos_in and the boundary of the cinvex_set
-    in direction of pos_out
+    in direction of pos_out,
+    the exact intersection is used if convex_set provides find_exit_parameter,
+    otherwise the bisection with iter_limit steps is performed
     """
+    if hasattr(convex_set, 'find_exit_parameter'):
+        direction = pos_out-pos_in
+        return convex_set.find_exit_parameter(pos_in, direction) * \
+            numpy.linalg.norm(direction)
     assert pos_in in convex_set
     assert pos_out not in convex_set
 
@@ -30,8 +41,72 @@ def find_distance_to_boundary(pos_in, pos_out, convex_set, iter_limit):
     return numpy.linalg.norm(res_pos-pos_in)
 
 
-def _add_single_segment(dist_list, in_segment_len):
-    dist_list.append(dist_list[-1]+in_segment_len)
+def get_inside_mask(in_convex_set, in_points):
+    """
+    returns the boolean mask of in_points which are inside in_convex_set,
+    uses in_convex_set.contains_many if available
+    """
+    points = numpy.asarray(in_points, dtype=float)
+    if hasattr(in_convex_set, 'contains_many'):
+        return numpy.asarray(in_convex_set.contains_many(points))
+    return numpy.array(
+        [_ in in_convex_set for _ in points.reshape(-1, 2)],
+        dtype=bool).reshape(points.shape[:-1])
+
+
+def _find_distances_to_boundary_by_bisection(
+        in_pos_in_array, in_pos_out_array, convex_set, iter_limit):
+    tmp_a = in_pos_in_array
+    tmp_b = in_pos_out_array
+    for _ in range(iter_limit):
+        pos_c = (tmp_a+tmp_b)/2
+        inside_mask = get_inside_mask(convex_set, pos_c)[:, numpy.newaxis]
+        tmp_a = numpy.where(inside_mask, pos_c, tmp_a)
+        tmp_b = numpy.where(inside_mask, tmp_b, pos_c)
+    return numpy.linalg.norm((tmp_a+tmp_b)/2-in_pos_in_array, axis=-1)
+
+
+def find_ray_distance_to_boundary(
+        pos_in, in_direction, convex_set, iter_limit):
+    """
+    returns the distance between the pos_in and the boundary of the convex_set
+    along the ray starting at pos_in in in_direction,
+    if convex_set does not provide find_exit_parameter, the points
+    pos_in+k*in_direction are checked in growing batches
+    and the bisection is performed in the segment leaving convex_set
+    """
+    if hasattr(convex_set, 'find_exit_parameter'):
+        return convex_set.find_exit_parameter(pos_in, in_direction) * \
+            numpy.linalg.norm(in_direction)
+    checked_num = 0
+    batch_size = 16
+    while True:
+        step_array = numpy.arange(checked_num+1, checked_num+batch_size+1)
+        inside_mask = get_inside_mask(
+            convex_set, pos_in+numpy.outer(step_array, in_direction))
+        if not inside_mask.all():
+            break
+        checked_num += batch_size
+        batch_size *= 2
+    out_step = step_array[numpy.argmin(inside_mask)]
+    return (out_step-1)*numpy.linalg.norm(in_direction) + \
+        find_distance_to_boundary(
+            pos_in+(out_step-1)*in_direction,
+            pos_in+out_step*in_direction,
+            convex_set, iter_limit)
+
+
+def calculate_dist_array(in_point_array):
+    """
+    returns the array of the lengths of the zig-zag curve
+    from in_point_array[..., 0, :] to in_point_array[..., k, :],
+    the leading dimensions of in_point_array are treated as batch dimensions
+    """
+    segment_lengths = numpy.linalg.norm(
+        numpy.diff(in_point_array, axis=-2), axis=-1)
+    res = numpy.zeros(segment_lengths.shape[:-1]+(segment_lengths.shape[-1]+1,))
+    numpy.cumsum(segment_lengths, axis=-1, out=res[..., 1:])
+    return res
 
 
 def calculate_dist_list(in_point_list):
@@ -40,13 +115,201 @@ def calculate_dist_list(in_point_list):
     res[k] is the length of the zig-zag curve from
     in_point_list[0] to in_point_list[k]
     """
-    res = [0.0]
-    for (cur_num, cur_pos) in enumerate(in_point_list[1:], 1):
-        prev_pos = in_point_list[cur_num-1]
-        _add_single_segment(res, numpy.linalg.norm(cur_pos-prev_pos))
+    return calculate_dist_array(
+        numpy.asarray(in_point_list, dtype=float)).tolist()
+
+
+def get_max_len_inside_batch(
+        in_point_array, in_convex_set, iter_limit=10, in_inside_mask=None):
+    """
+    returns the array of the lengths of the (extended) curves
+    given by the MxNx2 array in_point_array inside in_convex_set,
+    in_inside_mask is the already known MxN mask of the points inside
+    """
+    point_array = numpy.asarray(in_point_array, dtype=float)
+    inside_mask = get_inside_mask(in_convex_set, point_array) \
+        if in_inside_mask is None else in_inside_mask
+    assert inside_mask[:, 0].all()
+    all_inside = inside_mask.all(axis=1)
+    row_nums = numpy.arange(len(point_array))
+    last_inside = numpy.where(
+        all_inside,
+        point_array.shape[1]-1, numpy.argmin(inside_mask, axis=1)-1)
+    pos_in_array = point_array[row_nums, last_inside]
+    direction_array = numpy.where(
+        all_inside[:, numpy.newaxis],
+        extendable_curve.get_last_directions(point_array),
+        point_array[row_nums, numpy.minimum(
+            last_inside+1, point_array.shape[1]-1)]-pos_in_array)
+    res = calculate_dist_array(point_array)[row_nums, last_inside]
+    if hasattr(in_convex_set, 'find_exit_parameter'):
+        return res + \
+            in_convex_set.find_exit_parameter(
+                pos_in_array, direction_array) * \
+            numpy.linalg.norm(direction_array, axis=-1)
+    res[~all_inside] += _find_distances_to_boundary_by_bisection(
+        pos_in_array[~all_inside],
+        pos_in_array[~all_inside]+direction_array[~all_inside],
+        in_convex_set, iter_limit)
+    for row_num in numpy.flatnonzero(all_inside):
+        res[row_num] += find_ray_distance_to_boundary(
+            pos_in_array[row_num], direction_array[row_num],
+            in_convex_set, iter_limit)
     return res
 
 
+def get_len_inside_bounds_batch(
+        in_point_array, in_convex_set, in_inside_mask=None):
+    """
+    returns the arrays of the lower and the upper bounds of the lengths
+    of the (extended) curves given by the MxNx2 array in_point_array
+    inside in_convex_set obtained without searching for the boundary:
+    the length up to the last vertex inside and up to the first vertex outside,
+    in_inside_mask is the already known MxN mask of the points inside
+    """
+    point_array = numpy.asarray(in_point_array, dtype=float)
+    inside_mask = get_inside_mask(in_convex_set, point_array) \
+        if in_inside_mask is None else in_inside_mask
+    assert inside_mask[:, 0].all()
+    all_inside = inside_mask.all(axis=1)
+    first_outside = numpy.argmin(inside_mask, axis=1)
+    dist_array = calculate_dist_array(point_array)
+    row_nums = numpy.arange(len(point_array))
+    lower_bounds = dist_array[row_nums, numpy.where(
+        all_inside, point_array.shape[1]-1, first_outside-1)]
+    upper_bounds = numpy.where(
+        all_inside, numpy.inf, dist_array[row_nums, first_outside])
+    return lower_bounds, upper_bounds
+
+
+def _get_dist_and_grad(in_point_array, in_point_num):
+    segments = numpy.diff(in_point_array[:in_point_num+1], axis=0)
+    segment_lengths = numpy.linalg.norm(segments, axis=-1)
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        unit_segments = numpy.where(
+            segment_lengths[:, numpy.newaxis] > 0,
+            segments/segment_lengths[:, numpy.newaxis], 0)
+    res_grad = numpy.zeros_like(in_point_array)
+    res_grad[1:in_point_num+1] += unit_segments
+    res_grad[:in_point_num] -= unit_segments
+    return segment_lengths.sum(), res_grad
+
+
+def get_max_len_inside_and_grad(in_point_array, in_convex_set):
+    """
+    returns the length of the (extended) curve given by the Nx2 array
+    in_point_array inside in_convex_set and its Nx2 gradient
+    with respect to the points,
+    in_convex_set has to provide find_exit_parameter and get_outward_normals
+    """
+    point_array = numpy.asarray(in_point_array, dtype=float)
+    inside_mask = get_inside_mask(in_convex_set, point_array)
+    assert inside_mask[0]
+    if inside_mask.all():
+        base_num = len(point_array)-1
+        direction = extendable_curve.get_last_directions(point_array)
+        dir_nums = (base_num-1, base_num) if numpy.array_equal(
+            direction, point_array[-1]-point_array[-2]) else None
+    else:
+        base_num = int(numpy.argmin(inside_mask))-1
+        direction = point_array[base_num+1]-point_array[base_num]
+        dir_nums = (base_num, base_num+1)
+    res_len, res_grad = _get_dist_and_grad(point_array, base_num)
+    exit_param = in_convex_set.find_exit_parameter(
+        point_array[base_num], direction)
+    dir_len = numpy.linalg.norm(direction)
+    normal = in_convex_set.get_outward_normals(
+        point_array[base_num]+exit_param*direction)
+    # the exit point p+t*d stays on the boundary: n.(dp+t*dd+d*dt) = 0
+    base_grad = -dir_len*normal/numpy.dot(normal, direction)
+    res_grad[base_num] += base_grad
+    if dir_nums is not None:
+        dir_grad = exit_param*(direction/dir_len+base_grad)
+        res_grad[dir_nums[1]] += dir_grad
+        res_grad[dir_nums[0]] -= dir_grad
+    return res_len+exit_param*dir_len, res_grad
+
+
+def _get_first_outside(in_convex_set, in_point_array, in_start_num):
+    inside_mask = get_inside_mask(in_convex_set, in_point_array[in_start_num:])
+    if inside_mask.all():
+        return len(in_point_array)
+    return in_start_num+int(numpy.argmin(inside_mask))
+
+
+def _get_len_inside(
+        in_point_array, in_dist_array, in_first_outside, in_convex_set,
+        iter_limit):
+    if in_first_outside == len(in_point_array):
+        return in_dist_array[-1]+find_ray_distance_to_boundary(
+            in_point_array[-1],
+            extendable_curve.get_last_directions(in_point_array),
+            in_convex_set, iter_limit)
+    return in_dist_array[in_first_outside-1]+find_distance_to_boundary(
+        in_point_array[in_first_outside-1], in_point_array[in_first_outside],
+        in_convex_set, iter_limit)
+
+
+def get_escape_state(in_point_array, in_convex_set_list, iter_limit=10):
+    """
+    returns the EscapeState of the (extended) curve given by the Nx2 array
+    in_point_array with respect to the sets in in_convex_set_list:
+    the points, the lengths of the curve up to every point,
+    the indices of the first points outside of every set (N if all inside),
+    the lengths inside every set and iter_limit
+    """
+    point_array = numpy.asarray(in_point_array, dtype=float)
+    dist_array = calculate_dist_array(point_array)
+    first_outside = numpy.array(
+        [_get_first_outside(_, point_array, 0) for _ in in_convex_set_list],
+        dtype=int)
+    assert first_outside.all()
+    return EscapeState(
+        point_array, dist_array, first_outside,
+        numpy.array([
+            _get_len_inside(
+                point_array, dist_array, _f, _s, iter_limit)
+            for (_f, _s) in zip(first_outside, in_convex_set_list)]),
+        iter_limit)
+
+
+def update_escape_state(
+        in_state, in_get_point_array, in_first_changed, in_convex_set_list):
+    """
+    returns the EscapeState of the curve given by in_get_point_array()
+    which agrees with in_state.point_array before the point in_first_changed:
+    the lengths up to the unchanged points are reused,
+    the lengths inside the sets left before in_first_changed are reused
+    and the other sets check only the points from in_first_changed,
+    in_get_point_array is not called if no length has to be recomputed
+    """
+    assert in_first_changed > 0
+    changed_nums = numpy.flatnonzero(in_state.first_outside >= in_first_changed)
+    if in_first_changed >= len(in_state.point_array) or \
+            len(changed_nums) == 0:
+        return in_state
+    point_array = numpy.asarray(in_get_point_array(), dtype=float)
+    dist_array = in_state.dist_array.copy()
+    numpy.cumsum(
+        numpy.concatenate((
+            dist_array[in_first_changed-1:in_first_changed],
+            numpy.linalg.norm(
+                numpy.diff(point_array[in_first_changed-1:], axis=0),
+                axis=-1))),
+        out=dist_array[in_first_changed-1:])
+    first_outside = in_state.first_outside.copy()
+    len_array = in_state.len_array.copy()
+    for set_num in changed_nums:
+        first_outside[set_num] = _get_first_outside(
+            in_convex_set_list[set_num], point_array, in_first_changed)
+        len_array[set_num] = _get_len_inside(
+            point_array, dist_array, first_outside[set_num],
+            in_convex_set_list[set_num], in_state.iter_limit)
+    return EscapeState(
+        point_array, dist_array, first_outside, len_array,
+        in_state.iter_limit)
+
+
 def get_curve_class(in_curve_class):
     """returns a Curve class"""
     class Curve(in_curve_class):  # pylint: disable=too-few-public-methods
@@ -55,24 +318,21 @@ def get_curve_class(in_curve_class):
         """
         def __init__(self, *args):
             super().__init__(*args)
-            self._dist_list = calculate_dist_list(self.point_list)
-
-        def _add_single_point(self):
-            super()._add_single_point()
-            _add_single_segment(
-                self._dist_list,
-                numpy.linalg.norm(self.point_list[-1]-self.point_list[-2]))
-            assert len(self._dist_list) == len(self._point_list)
+            self._dist_array = calculate_dist_array(self.point_list)
 
         def get_max_len_inside(self, in_convex_set, iter_limit=10):
             """
             returns the length of the curve inside in_convex_set
             """
-            assert self.point_list[0] in in_convex_set
-            cur_ind = 0
-            while self[cur_ind] in in_convex_set:
-                cur_ind += 1
-            return self._dist_list[cur_ind-1] + \
+            inside_mask = get_inside_mask(in_convex_set, self.point_list)
+            assert inside_mask[0]
+            if inside_mask.all():
+                return self._dist_array[-1] + \
+                    find_ray_distance_to_boundary(
+                        self.point_list[-1], self.last_direction,
+                        in_convex_set, iter_limit)
+            cur_ind = int(numpy.argmin(inside_mask))
+            return self._dist_array[cur_ind-1] + \
                 find_distance_to_boundary(
                     self[cur_ind-1], self[cur_ind], in_convex_set, iter_limit)
     return Curve
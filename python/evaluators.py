@@ -1,11 +1,133 @@
 """contains definitions of the cost functions"""
+import collections
+import numpy
+import scipy.special
+
+import escape_curve
+import shape_families as sf
+
+
+EvaluationResult = collections.namedtuple(
+    'EvaluationResult', ['len_array', 'sum', 'max', 'argmax', 'softmax'])
+
+
+def get_evaluation_result(in_len_array, in_softmax_temperature):
+    """
+    returns the EvaluationResult for the given lengths inside of the shapes,
+    softmax is the temperature-weighted log-sum-exp of the lengths
+    """
+    len_array = numpy.asarray(in_len_array, dtype=float)
+    return EvaluationResult(
+        len_array,
+        float(len_array.sum()),
+        float(len_array.max()),
+        int(len_array.argmax()),
+        float(in_softmax_temperature*scipy.special.logsumexp(
+            len_array/in_softmax_temperature)))
+
+
+class EvaluationCache:
+    """
+    bounded cache of the values of a function of a data vector
+    with the least recently used entry evicted first,
+    the data vectors are identified by their raw bytes
+    """
+    def __init__(self, in_evaluate_fun, in_capacity=1024):
+        assert in_capacity > 0
+        self._evaluate_fun = in_evaluate_fun
+        self._capacity = in_capacity
+        self._values = collections.OrderedDict()
+        self._hit_count = 0
+        self._miss_count = 0
+
+    def __call__(self, in_data):
+        key = numpy.asarray(in_data, dtype=float).tobytes()
+        if key in self._values:
+            self._hit_count += 1
+            self._values.move_to_end(key)
+            return self._values[key]
+        self._miss_count += 1
+        res = self._evaluate_fun(in_data)
+        self._values[key] = res
+        if len(self._values) > self._capacity:
+            self._values.popitem(last=False)
+        return res
+
+    def __len__(self):
+        return len(self._values)
+
+    def clear(self):
+        """removes all of the cached values"""
+        self._values.clear()
+
+    @property
+    def hit_count(self):
+        """returns the number of the calls answered from the cache"""
+        return self._hit_count
+
+    @property
+    def miss_count(self):
+        """returns the number of the calls evaluating the function"""
+        return self._miss_count
+
+
+def _get_incremental_escape_state(
+        in_incremental_state, in_data_representation, in_shape_list,
+        in_data, in_iter_limit):
+    """
+    returns the EscapeState of the curve represented by in_data updated
+    from the state in in_incremental_state sharing the longest unchanged
+    prefix: the last evaluated one or the last one evaluated from scratch
+    (the base of the local moves of the optimisers)
+    """
+    data = numpy.array(in_data, dtype=float)
+    first_changed, base_state = 0, None
+    for (base_data, cur_state) in in_incremental_state.values():
+        if len(base_data) != len(data) or \
+                cur_state.iter_limit != in_iter_limit:
+            continue
+        changed_mask = data != base_data
+        cur_first_changed = \
+            in_data_representation.get_first_changed_point(
+                int(changed_mask.argmax())) if changed_mask.any() \
+            else len(cur_state.point_array)
+        if cur_first_changed > first_changed:
+            first_changed, base_state = cur_first_changed, cur_state
+
+    def get_point_array():
+        return in_data_representation.to_curves_batch([data])[0]
+    if first_changed <= 1:
+        res = escape_curve.get_escape_state(
+            get_point_array(), in_shape_list, in_iter_limit)
+        in_incremental_state['anchor'] = (data, res)
+    else:
+        res = escape_curve.update_escape_state(
+            base_state, get_point_array, first_changed, in_shape_list)
+    in_incremental_state['last'] = (data, res)
+    return res
 
 
 def get_single_shape_evaluator(
         in_data_representation, in_shape, in_iter_limit):
-    """returns the Evaluator class for single shape"""
+    """
+    returns the Evaluator class for single shape,
+    in_iter_limit is the initial iteration limit of the boundary searches
+    """
+    precision_state = {'iter_limit': in_iter_limit}
+    incremental_state = {}
+
     class Evaluator:
         """utilities to evaluate data or curve in problems with single shape"""
+        @classmethod
+        def set_iter_limit(cls, in_iter_limit):
+            """sets the iteration limit of the boundary searches"""
+            precision_state['iter_limit'] = in_iter_limit
+
+        @classmethod
+        def get_iter_limit(cls):
+            """returns the iteration limit of the boundary searches"""
+            return precision_state['iter_limit']
+
         @classmethod
         def _to_curve(cls, in_data):
             return in_data_representation.to_curve(in_data)
@@ -13,35 +135,184 @@ def get_single_shape_evaluator(
         @classmethod
         def evaluate_curve(cls, in_curve):
             """returns the lenth of the in_curve inside given shape"""
-            return in_curve.get_max_len_inside(in_shape, in_iter_limit)
+            return in_curve.get_max_len_inside(in_shape, cls.get_iter_limit())
 
         @classmethod
         def evaluate_data(cls, in_data):
             """
-            returns the lenth of the curve represented by in_data
+            returns the length of the curve represented by in_data
             inside given shape
             """
             return cls.evaluate_curve(cls._to_curve(in_data))
 
+        @classmethod
+        def evaluate_data_incremental(cls, in_data):
+            """
+            returns the length of the curve represented by in_data
+            inside given shape reusing the evaluation of the previous call
+            for the points not moved by the changed coordinates
+            (cf. escape_curve.update_escape_state)
+            """
+            return float(_get_incremental_escape_state(
+                incremental_state, in_data_representation, [in_shape],
+                in_data, cls.get_iter_limit()).len_array[0])
+
+        @classmethod
+        def evaluate_data_batch(cls, in_data_matrix):
+            """
+            returns the array of the lenths of the curves represented
+            by the rows of in_data_matrix inside given shape
+            """
+            return escape_curve.get_max_len_inside_batch(
+                in_data_representation.to_curves_batch(in_data_matrix),
+                in_shape, cls.get_iter_limit())
+
+        @classmethod
+        def evaluate_data_and_grad(cls, in_data):
+            """
+            returns the length of the curve represented by in_data
+            inside given shape and its gradient with respect to in_data,
+            the shape has to provide find_exit_parameter
+            and get_outward_normals
+            """
+            res_len, point_grad = escape_curve.get_max_len_inside_and_grad(
+                in_data_representation.to_curves_batch([in_data])[0],
+                in_shape)
+            return res_len, in_data_representation.get_data_gradient(
+                in_data, point_grad)
+
     return Evaluator
 
 
+def _is_pruning_useful(in_shape_list):
+    """
+    checks if the boundary searches of in_shape_list are expensive enough
+    to be pruned: the shapes (or the base shape of the family)
+    do not provide the closed-form find_exit_parameter
+    """
+    if hasattr(in_shape_list, 'get_pruning_data'):
+        return not hasattr(in_shape_list.base_shape, 'find_exit_parameter')
+    if hasattr(in_shape_list, 'get_max_len_inside_array'):
+        return False
+    return not all(hasattr(_, 'find_exit_parameter') for _ in in_shape_list)
+
+
 def get_multiple_shape_evaluator(
-        in_data_representation, in_shape_list, in_iter_limit):
-    """returns the Evaluator class for multiple shapes"""
+        in_data_representation, in_shape_list, in_iter_limit,
+        in_softmax_temperature=0.05):
+    """
+    returns the Evaluator class for multiple shapes,
+    in_shape_list can be a list of shapes or a shape family
+    providing the method get_max_len_inside_array,
+    in_iter_limit is the initial iteration limit of the boundary searches
+    """
+    pruning_state = {'argmax': 0, 'exact_evaluation_count': 0}
+    precision_state = {'iter_limit': in_iter_limit}
+    incremental_state = {}
+
     class Evaluator:
         """
         utilities to evaluate data or curve in problems with multiple shapes
         """
+        @classmethod
+        def set_iter_limit(cls, in_iter_limit):
+            """sets the iteration limit of the boundary searches"""
+            precision_state['iter_limit'] = in_iter_limit
+
+        @classmethod
+        def get_iter_limit(cls):
+            """returns the iteration limit of the boundary searches"""
+            return precision_state['iter_limit']
+
         @classmethod
         def _to_curve(cls, in_data):
             return in_data_representation.to_curve(in_data)
 
         @classmethod
         def _get_result_list_for_curve(cls, in_curve):
-            return [in_curve.get_max_len_inside(_, in_iter_limit)
+            if hasattr(in_shape_list, 'get_max_len_inside_array'):
+                return in_shape_list.get_max_len_inside_array(
+                    in_curve.point_list, cls.get_iter_limit())
+            return [in_curve.get_max_len_inside(_, cls.get_iter_limit())
                     for _ in in_shape_list]
 
+        @classmethod
+        def _get_pruning_data(cls, in_curve):
+            if hasattr(in_shape_list, 'get_pruning_data'):
+                return in_shape_list.get_pruning_data(in_curve.point_list)
+            bound_list = [
+                escape_curve.get_len_inside_bounds_batch(
+                    in_curve.point_list[numpy.newaxis], _)
+                for _ in in_shape_list]
+
+            def get_exact_lens(in_shape_nums, in_iter_limit):
+                return numpy.array(
+                    [in_curve.get_max_len_inside(
+                        in_shape_list[_], in_iter_limit)
+                     for _ in in_shape_nums])
+            return sf.PruningData(
+                *(numpy.concatenate(_) for _ in zip(*bound_list)),
+                get_exact_lens)
+
+        @classmethod
+        def _get_exact_lens(cls, in_pruning_data, in_shape_nums):
+            pruning_state['exact_evaluation_count'] += len(in_shape_nums)
+            return in_pruning_data.get_exact_lens(
+                in_shape_nums, cls.get_iter_limit())
+
+        @classmethod
+        def evaluate_curve_max_pruned(cls, in_curve):
+            """
+            returns the maximum length of the curve inside in_shapes
+            (as evaluate_curve_max), the boundary search is performed first
+            for the shape being the argmax in the previous call and then only
+            for the shapes whose upper bound exceeds the current maximum,
+            the shapes with closed-form exits (find_exit_parameter)
+            are evaluated without pruning, as the bounds cost about as much
+            as their exact lengths
+            """
+            if not _is_pruning_useful(in_shape_list):
+                return cls.evaluate_curve_max(in_curve)
+            pruning_data = cls._get_pruning_data(in_curve)
+            lower_bounds = pruning_data.lower_bounds
+            first_num = min(
+                pruning_state['argmax'], len(pruning_data.upper_bounds)-1)
+            best_num = first_num
+            best_val = cls._get_exact_lens(
+                pruning_data, numpy.array([first_num]))[0]
+            if lower_bounds.max() > best_val:
+                best_num = int(lower_bounds.argmax())
+                best_val = lower_bounds[best_num]
+            candidate_nums = numpy.flatnonzero(
+                pruning_data.upper_bounds > best_val)
+            candidate_nums = candidate_nums[candidate_nums != first_num]
+            if len(candidate_nums) > 0:
+                candidate_vals = cls._get_exact_lens(
+                    pruning_data, candidate_nums)
+                if candidate_vals.max() > best_val:
+                    best_num = int(candidate_nums[candidate_vals.argmax()])
+                    best_val = candidate_vals.max()
+            pruning_state['argmax'] = best_num
+            return best_val
+
+        @classmethod
+        def get_exact_evaluation_count(cls):
+            """
+            returns the number of the boundary searches
+            performed by evaluate_curve_max_pruned
+            """
+            return pruning_state['exact_evaluation_count']
+
+        @classmethod
+        def evaluate_curve_result(cls, in_curve):
+            """
+            returns the EvaluationResult of the curve
+            holding the lengths inside all of in_shapes and their aggregates
+            """
+            return get_evaluation_result(
+                cls._get_result_list_for_curve(in_curve),
+                in_softmax_temperature)
+
         @classmethod
         def evaluate_curve_max(cls, in_curve):
             """
@@ -70,4 +341,113 @@ def get_multiple_shape_evaluator(
             """
             return cls.evaluate_curve_sum(cls._to_curve(in_data))
 
+        @classmethod
+        def evaluate_data_max_pruned(cls, in_data):
+            """
+            calls cls.evaluate_curve_max_pruned
+            for the curve represented by in_data
+            """
+            return cls.evaluate_curve_max_pruned(cls._to_curve(in_data))
+
+        @classmethod
+        def evaluate_data_result(cls, in_data):
+            """
+            calls cls.evaluate_curve_result for the curve represented by in_data
+            """
+            return cls.evaluate_curve_result(cls._to_curve(in_data))
+
+        @classmethod
+        def evaluate_data_result_incremental(cls, in_data):
+            """
+            returns the EvaluationResult of the curve represented by in_data
+            (as evaluate_data_result) reusing the evaluation of the previous
+            call for the points not moved by the changed coordinates
+            (cf. escape_curve.update_escape_state),
+            the shape families are evaluated as a whole
+            """
+            if hasattr(in_shape_list, 'get_max_len_inside_array'):
+                return cls.evaluate_data_result(in_data)
+            return get_evaluation_result(
+                _get_incremental_escape_state(
+                    incremental_state, in_data_representation, in_shape_list,
+                    in_data, cls.get_iter_limit()).len_array,
+                in_softmax_temperature)
+
+        @classmethod
+        def evaluate_data_max_and_grad(cls, in_data):
+            """
+            returns the maximum length inside in_shapes of the curve
+            represented by in_data and the gradient with respect to in_data
+            of the length inside the shape attaining the maximum,
+            the shapes have to provide find_exit_parameter
+            and get_outward_normals
+            """
+            point_array = in_data_representation.to_curves_batch([in_data])[0]
+            argmax = int(numpy.argmax(
+                cls._get_result_list_for_curve(cls._to_curve(in_data))))
+            if hasattr(in_shape_list, 'get_max_len_inside_and_grad'):
+                res_len, point_grad = \
+                    in_shape_list.get_max_len_inside_and_grad(
+                        point_array, argmax)
+            else:
+                res_len, point_grad = \
+                    escape_curve.get_max_len_inside_and_grad(
+                        point_array, in_shape_list[argmax])
+            return res_len, in_data_representation.get_data_gradient(
+                in_data, point_grad)
+
+        @classmethod
+        def _get_result_matrix_for_batch(cls, in_data_matrix):
+            point_array = in_data_representation.to_curves_batch(
+                in_data_matrix)
+            if hasattr(in_shape_list, 'get_max_len_inside_array'):
+                return in_shape_list.get_max_len_inside_array(
+                    point_array, cls.get_iter_limit())
+            return numpy.stack(
+                [escape_curve.get_max_len_inside_batch(
+                    point_array, _, cls.get_iter_limit())
+                 for _ in in_shape_list],
+                axis=1)
+
+        @classmethod
+        def evaluate_data_batch_max(cls, in_data_matrix):
+            """
+            returns the array of the maximum lengths inside in_shapes
+            of the curves represented by the rows of in_data_matrix
+            """
+            return cls._get_result_matrix_for_batch(in_data_matrix).max(axis=1)
+
+        @classmethod
+        def evaluate_data_batch_sum(cls, in_data_matrix):
+            """
+            returns the array of the sums of the lengths inside in_shapes
+            of the curves represented by the rows of in_data_matrix
+            """
+            return cls._get_result_matrix_for_batch(in_data_matrix).sum(axis=1)
+
     return Evaluator
+
+
+def get_halfplane_family_evaluator(
+        in_data_representation, in_angles, in_offset=1.0,
+        in_len_limit=sf.DEFAULT_LEN_LIMIT):
+    """
+    returns the Evaluator class for the family of half-planes
+    given by in_angles and in_offset (cf. shape_families.HalfplaneFamily)
+    """
+    return get_multiple_shape_evaluator(
+        in_data_representation,
+        sf.HalfplaneFamily(in_angles, in_offset, in_len_limit), None)
+
+
+def get_strip_family_evaluator(
+        in_data_representation, in_angles, in_shifts, in_width=1.0,
+        in_len_limit=sf.DEFAULT_LEN_LIMIT):
+    """
+    returns the Evaluator class for the family of strips
+    given by in_angles, in_shifts and in_width
+    (cf. shape_families.StripFamily)
+    """
+    return get_multiple_shape_evaluator(
+        in_data_representation,
+        sf.StripFamily(in_angles, in_shifts, in_width, in_len_limit), None)
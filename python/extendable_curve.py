@@ -3,6 +3,18 @@ import numpy
 import curve
 
 
+def get_last_directions(in_point_array):
+    """
+    returns the shifts between the points of the extensions of the curves
+    given by in_point_array,
+    the leading dimensions of in_point_array are treated as batch dimensions
+    """
+    last_diff = in_point_array[..., -1, :]-in_point_array[..., -2, :]
+    return numpy.where(
+        numpy.linalg.norm(last_diff, axis=-1)[..., numpy.newaxis] < 0.0001,
+        numpy.array([1.0, 0.0]), last_diff)
+
+
 def get_curve_class(in_curve_class):
     """returns a Curve class"""
     class Curve(in_curve_class):  # pylint: disable=too-few-public-methods
@@ -11,15 +23,19 @@ def get_curve_class(in_curve_class):
         in the direction of the last segment
         """
         def __getitem__(self, in_ind):
-            while in_ind >= len(self.point_list):
-                self._add_single_point()
-            return self.point_list[in_ind]
+            """
+            returns the point of given index of the extended curve,
+            the curve itself is not modified
+            """
+            if in_ind < len(self.point_list):
+                return self.point_list[in_ind]
+            return self.point_list[-1] + \
+                (in_ind-len(self.point_list)+1)*self.last_direction
 
-        def _add_single_point(self):
-            last_diff = self.point_list[-1]-self.point_list[-2]
-            if numpy.linalg.norm(last_diff) < 0.0001:
-                last_diff = numpy.array([1.0, 0.0])
-            self._point_list.append(self.point_list[-1]+last_diff)
+        @property
+        def last_direction(self):
+            """returns the shift between the points of the extension"""
+            return get_last_directions(self.point_list)
     return Curve
 
 
@@ -0,0 +1,64 @@
+"""contains the definition of the class FrameRenderer"""
+
+import matplotlib.pyplot as plt
+
+
+class FrameRenderer:
+    """
+    draws the frames of an animation in a single persistent figure:
+    the static artists are drawn once by in_draw_static_fun,
+    the frames only update the data of the named lines
+    and are saved with the bounding box computed for the first frame,
+    without given limits the axes are scaled to the first frame
+    """
+    def __init__(self, in_draw_static_fun=None, **kwargs):
+        self._figure = plt.figure(figsize=kwargs.get('figsize', None))
+        self._axes = self._figure.gca()
+        self._axes.set_aspect('equal', adjustable='box')
+        self._axes.axis('off')
+        if in_draw_static_fun is not None:
+            in_draw_static_fun()
+        if kwargs.get('xlim', None) is not None:
+            self._axes.set_xlim(kwargs['xlim'])
+        if kwargs.get('ylim', None) is not None:
+            self._axes.set_ylim(kwargs['ylim'])
+        self._pad_inches = kwargs.get('pad_inches', 0.01)
+        self._lines = {}
+        self._bbox = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def start_frame(self):
+        """hides all of the lines of the previous frame"""
+        for _ in self._lines.values():
+            _.set_visible(False)
+
+    def plot(self, in_key, in_x_list, in_y_list, **kwargs):
+        """
+        shows the line in_key with given points,
+        kwargs (as in plt.plot) are used when the line is created
+        at the first call
+        """
+        if in_key not in self._lines:
+            self._lines[in_key], = self._axes.plot(
+                in_x_list, in_y_list, **kwargs)
+        else:
+            self._lines[in_key].set_data(in_x_list, in_y_list)
+            self._lines[in_key].set_visible(True)
+
+    def save(self, in_path):
+        """saves the current frame to in_path"""
+        if self._bbox is None:
+            self._axes.autoscale_view()
+            self._axes.set_autoscale_on(False)
+            self._bbox = self._figure.get_tightbbox().padded(
+                self._pad_inches)
+        self._figure.savefig(in_path, bbox_inches=self._bbox)
+
+    def close(self):
+        """closes the figure"""
+        plt.close(self._figure)
@@ -6,6 +6,7 @@ import copy
 import random
 import matplotlib.pyplot as plt
 
+import frame_renderer as fr
 import output_paths as op
 import tex_string_utils as tsu
 
@@ -64,16 +65,24 @@ class _Crystal:
         cur_shift = self.shifts.get(in_node, (0, 0))
         return in_node[0]+cur_shift[0], in_node[1]+cur_shift[1]
 
-    def plot(self):
-        """plots crystal net"""
+    def plot(self, in_renderer=None):
+        """
+        plots crystal net,
+        updates the lines of in_renderer (FrameRenderer) if given
+        """
+        def plot_in_figure(_in_key, *args, **kwargs):
+            plt.plot(*args, **kwargs)
+        plot_fun = plot_in_figure if in_renderer is None else in_renderer.plot
         for cur_nodes in self.edges:
-            plt.plot(
+            plot_fun(
+                cur_nodes,
                 [self._get_node_pos(_)[0] for _ in cur_nodes],
                 [self._get_node_pos(_)[1] for _ in cur_nodes],
                 linestyle='-', color='gray', marker='')
         for _ in self.nodes:
-            plt.plot(
-                *self._get_node_pos(_),
+            plot_fun(
+                _,
+                [self._get_node_pos(_)[0]], [self._get_node_pos(_)[1]],
                 **self.node_styles.get(
                     _, {'color': 'black', 'marker': 'o', 'markersize': 4}))
 
@@ -230,15 +239,14 @@ _call_save_fig(1)
 plt.close()
 
 FRAME_LIMIT = 15
-for frame_num in range(2, FRAME_LIMIT):
-    _init_figure()
-    tmp_crystal = copy.deepcopy(DEFECTED_CRYSTAL)
-    for _ in tmp_crystal.nodes:
-        tmp_crystal.add_shift(
-            _, tuple(random.normalvariate(0, 0.025) for _ in range(2)))
-    tmp_crystal.plot()
-    _call_save_fig(frame_num)
-    plt.close()
+with fr.FrameRenderer() as RENDERER:
+    for frame_num in range(2, FRAME_LIMIT):
+        tmp_crystal = copy.deepcopy(DEFECTED_CRYSTAL)
+        for _ in tmp_crystal.nodes:
+            tmp_crystal.add_shift(
+                _, tuple(random.normalvariate(0, 0.025) for _ in range(2)))
+        tmp_crystal.plot(RENDERER)
+        RENDERER.save(_get_output_paths().get_pdf_file_path(frame_num))
 
 _tex_str = ''
 for _ in range(2):
@@ -6,9 +6,9 @@ import copy
 import math
 import itertools
 import numpy
-import matplotlib.pyplot as plt
 
 import curve
+import frame_renderer as fr
 import output_paths as op
 import project_styles as ps
 import tex_string_utils as tsu
@@ -20,16 +20,18 @@ def _to_curve(in_curve_class, in_angle_list):
     return in_curve_class(in_angle_list, 1)
 
 
-def _plot_angle_list(in_curve_class, angle_list):
+def _plot_angle_list(in_renderer, in_curve_class, angle_list):
     color_dict = {
         curve.LogoCurve: ps.LOGO_COLOR,
         curve.AzimuthCurve: ps.AZIMUTH_COLOR}
     cur_curve = _to_curve(in_curve_class, angle_list)
-    plt.plot(
-        cur_curve.x_list, cur_curve.y_list,
+    in_renderer.plot(
+        'curve', cur_curve.x_list, cur_curve.y_list,
         color=color_dict[in_curve_class], linewidth=4)
-    plt.plot(
-        cur_curve.x_list[_PERTURBED_IND], cur_curve.y_list[_PERTURBED_IND],
+    in_renderer.plot(
+        'perturbed',
+        [cur_curve.x_list[_PERTURBED_IND]],
+        [cur_curve.y_list[_PERTURBED_IND]],
         marker='o', color='red', markersize=10)
 
 
@@ -73,29 +75,16 @@ def _transform_angles(in_curve_class, in_angle_list):
 
 def _make_animation_data(
         in_curve_class, angle_list, perturbation_list, limits, in_tex_name):
-
-    def init_figure():
-        plt.figure()
-        plt.gca().set_aspect('equal', adjustable='box')
-        plt.axis('off')
-
-    def save_plot_to_pdf(in_num, in_output_paths):
-        plt.savefig(
-            in_output_paths.get_pdf_file_path(in_num),
-            bbox_inches='tight', pad_inches=0.01)
     output_paths = op.OutputPaths(in_tex_name)
     true_angle_list = _transform_angles(in_curve_class, angle_list)
     frame_params = list(perturbation_list)
     frame_params = frame_params+(frame_params[1:-1])[::-1]
-    for (frame_num, cur_perturbation) in enumerate(frame_params):
-        init_figure()
-        _plot_angle_list(
-            in_curve_class,
-            _perturbe_angle_list(true_angle_list, cur_perturbation))
-        plt.gca().set_xlim(limits[0])
-        plt.gca().set_ylim(limits[1])
-        save_plot_to_pdf(frame_num, output_paths)
-        plt.close()
+    with fr.FrameRenderer(xlim=limits[0], ylim=limits[1]) as renderer:
+        for (frame_num, cur_perturbation) in enumerate(frame_params):
+            _plot_angle_list(
+                renderer, in_curve_class,
+                _perturbe_angle_list(true_angle_list, cur_perturbation))
+            renderer.save(output_paths.get_pdf_file_path(frame_num))
 
     tsu.save_animategraphics_str(
         output_paths, 15,
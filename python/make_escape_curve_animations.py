@@ -3,19 +3,29 @@ creates all TeX data for the escape curve optimisation animations
 """
 
 import collections
-import itertools
+import functools
 import matplotlib.pyplot as plt
 import numpy
 
+import convex_shapes as cs
 import curve_representations as cr
 import optimisation_data_generators as odg
+import optimisation_result_store as ors
+import optimisation_continuation as oc
 import optimisation_animations_utils as oau
 import project_styles as ps
 import tex_string_utils as tsu
 import evaluators as ev
 import output_paths as op
 import plotable_convex_shapes as pcs
-import rotations
+import shape_families as sf
+
+
+_RESULT_STORE = ors.ResultStore()
+
+# the frames of the shorter animations are rendered faster in one figure
+# than by starting a process pool
+_POOL_MIN_FRAME_NUM = 128
 
 
 def _apply_dict(in_tex_name, in_dict):
@@ -53,36 +63,41 @@ def get_curve_name(in_tex_name):
     return _apply_dict(in_tex_name, res_dict)
 
 
-def _init_figure():
-    plt.figure(figsize=(3.2, 3.2))
-    plt.gca().set_aspect('equal', adjustable='box')
-    plt.axis('off')
-
-
 def _call_save_fig(in_output_paths, in_plot_num):
     plt.savefig(
         in_output_paths.get_pdf_file_path(in_plot_num),
         bbox_inches='tight', pad_inches=0.01)
 
 
+def _evaluate_opt_data(
+        in_opt_data, in_evaluate_data_fun, in_get_recorded_value_fun):
+    cached_fun = ev.EvaluationCache(in_evaluate_data_fun, len(in_opt_data))
+    return [
+        cached_fun(_.data) if in_get_recorded_value_fun(_) is None
+        else in_get_recorded_value_fun(_)
+        for _ in in_opt_data]
+
+
 def _create_optimisation_animation(
         in_tex_name, in_opt_data, in_data_representation,
-        in_draw_backgroud_fun, in_evaluate_fun,
+        in_draw_backgroud_fun, in_curve_len_list,
         **kwargs):
     output_paths = op.OutputPaths(in_tex_name)
-    for (cur_frame_num, cur_data_row) in enumerate(in_opt_data):
-        _init_figure()
-        in_draw_backgroud_fun()
-        oau.plot_data(
-            in_data_representation,
-            cur_data_row.data,
-            in_evaluate_fun,
-            get_curve_color(in_tex_name))
-        if kwargs.get('plot_limits', None) is not None:
-            plt.gca().set_xlim(kwargs.get('plot_limits', None).xlim)
-            plt.gca().set_ylim(kwargs.get('plot_limits', None).ylim)
-        _call_save_fig(output_paths, cur_frame_num)
-        plt.close()
+    plot_limits = kwargs.get('plot_limits', None)
+    oau.render_frames(
+        oau.AnimationSpec(
+            in_data_representation, get_curve_color(in_tex_name),
+            in_draw_backgroud_fun,
+            None if plot_limits is None
+            else (tuple(plot_limits.xlim), tuple(plot_limits.ylim))),
+        [oau.FrameSpec(
+            cur_data_row.data, cur_len,
+            output_paths.get_pdf_file_path(cur_frame_num))
+         for (cur_frame_num, (cur_data_row, cur_len)) in
+         enumerate(zip(in_opt_data, in_curve_len_list))],
+        kwargs.get(
+            'max_workers',
+            None if len(in_opt_data) >= _POOL_MIN_FRAME_NUM else 1))
     tsu.save_animategraphics_str(
         output_paths, 20, 'autoplay', 0, len(in_opt_data)-1)
 
@@ -94,12 +109,11 @@ def _save_tex_str_conv_plot(in_paths):
 
 def _create_conv_comparison_plot(
         in_opt_data_dict,
-        get_evaluate_data_dict, in_conv_plot_tex_name):
+        in_value_list_dict, in_conv_plot_tex_name):
     plt.figure(figsize=(5, 1.8))
     for (cur_tex_name, cur_opt_data) in in_opt_data_dict.items():
-        cur_evaluate_fun = get_evaluate_data_dict[cur_tex_name]
-        oau.plot_conv_data(
-            cur_opt_data, cur_evaluate_fun,
+        oau.plot_conv_values(
+            cur_opt_data, in_value_list_dict[cur_tex_name],
             color=get_curve_color(cur_tex_name),
             label=get_curve_name(cur_tex_name))
     output_paths = op.OutputPaths(in_conv_plot_tex_name)
@@ -127,27 +141,51 @@ def make_single_shape_plots(
     for (cur_tex_name, cur_representation) in \
             in_data_representation_dict.items():
         opt_data_dict[cur_tex_name] = \
-            odg.generate_single_shape_optimisation_data(
-                cur_representation, in_shape, 5)
+            _RESULT_STORE.generate(
+                odg.generate_single_shape_optimisation_data,
+                cur_representation, in_shape, 5, cache_capacity=4096)
 
+    value_list_dict = {}
     for (cur_tex_name, cur_opt_res) in opt_data_dict.items():
         cur_data_representation = in_data_representation_dict[cur_tex_name]
-        cur_evaluate_fun = ev.get_single_shape_evaluator(
-            cur_data_representation, in_shape, 10).evaluate_curve
+        value_list_dict[cur_tex_name] = _evaluate_opt_data(
+            cur_opt_res,
+            ev.get_single_shape_evaluator(
+                cur_data_representation, in_shape, 10).evaluate_data,
+            lambda x: x.value)
         _create_optimisation_animation(
             cur_tex_name, cur_opt_res,
             cur_data_representation,
-            lambda: in_shape.plot(**ps.CONVEX_COLORS),
-            cur_evaluate_fun,
+            functools.partial(in_shape.plot, **ps.CONVEX_COLORS),
+            value_list_dict[cur_tex_name],
             plot_limits=in_plot_limits)
 
-    evaluate_data_fun_dict = {}
-    for (cur_tex_name, cur_representation) in \
-            in_data_representation_dict.items():
-        evaluate_data_fun_dict[cur_tex_name] = ev.get_single_shape_evaluator(
-            cur_representation, in_shape, 10).evaluate_data
     _create_conv_comparison_plot(
-        opt_data_dict, evaluate_data_fun_dict, in_conv_plot_tex_name)
+        opt_data_dict, value_list_dict, in_conv_plot_tex_name)
+
+
+def _create_multiple_shape_plots(
+        in_opt_data_dict, in_data_representation_dict, in_shape_list,
+        in_conv_plot_tex_name, **kwargs):
+    max_list_dict = {}
+    for (cur_tex_name, cur_opt_res) in in_opt_data_dict.items():
+        cur_data_representation = in_data_representation_dict[cur_tex_name]
+        cur_result_list = _evaluate_opt_data(
+            cur_opt_res,
+            ev.get_multiple_shape_evaluator(
+                cur_data_representation, in_shape_list,
+                10).evaluate_data_result,
+            lambda x: x.result)
+        max_list_dict[cur_tex_name] = [_.max for _ in cur_result_list]
+        _create_optimisation_animation(
+            cur_tex_name, cur_opt_res,
+            cur_data_representation,
+            None,
+            max_list_dict[cur_tex_name],
+            **kwargs)
+
+    _create_conv_comparison_plot(
+        in_opt_data_dict, max_list_dict, in_conv_plot_tex_name)
 
 
 def make_multiple_shape_plots(
@@ -164,162 +202,77 @@ def make_multiple_shape_plots(
     for (cur_tex_name, cur_representation) in \
             in_data_representation_dict.items():
         opt_data_dict[cur_tex_name] = \
-            odg.generate_multiple_shape_optimisation_data(
+            _RESULT_STORE.generate(
+                odg.generate_multiple_shape_optimisation_data,
                 cur_representation, in_shape_list, 3,
                 {'maxiter': 100},
-                {'maxiter': 40})
+                {'maxiter': 40},
+                cache_capacity=4096)
 
-    for (cur_tex_name, cur_opt_res) in opt_data_dict.items():
-        cur_data_representation = in_data_representation_dict[cur_tex_name]
-        cur_evaluate_fun = ev.get_multiple_shape_evaluator(
-            cur_data_representation, in_shape_list, 10).evaluate_curve_max
-        _create_optimisation_animation(
-            cur_tex_name, cur_opt_res,
-            cur_data_representation,
-            lambda: None,
-            cur_evaluate_fun,
-            plot_limits=in_plot_limits)
+    _create_multiple_shape_plots(
+        opt_data_dict, in_data_representation_dict, in_shape_list,
+        in_conv_plot_tex_name, plot_limits=in_plot_limits)
 
-    evaluate_data_fun_dict = {}
-    for (cur_tex_name, cur_representation) in \
-            in_data_representation_dict.items():
-        evaluate_data_fun_dict[cur_tex_name] = ev.get_multiple_shape_evaluator(
-            cur_representation, in_shape_list, 10).evaluate_data_max
-    _create_conv_comparison_plot(
-        opt_data_dict, evaluate_data_fun_dict, in_conv_plot_tex_name)
-
-
-def _get_initial_data_for_second_step(
-        in_first_step_representation, in_first_step_res):
-    first_step_sol = in_first_step_representation.to_curve(
-        in_first_step_res[-1].data)
-    raw_first_step_opt = list(itertools.chain(*first_step_sol.point_list[1:]))
-    pos_limit_min = 1.05*min(_ for _ in raw_first_step_opt)
-    pos_limit_max = 1.05*max(_ for _ in raw_first_step_opt)
 
-    second_step_representation = cr.PointCurveRepresentation(
-        len(raw_first_step_opt), pos_limit_min, pos_limit_max)
-    return raw_first_step_opt, second_step_representation
-
-
-def two_step_scheme(
-        in_shape_list,
-        in_first_step_representation,
-        in_first_step_tex_name, in_second_step_tex_name,
-        in_conv_plot_tex_name, **kwargs):
-    """runs the two-step-scheme"""
-
-    def shift_second_step_time(in_first_step_res, in_second_step_res):
-        res = []
-        first_step_end_time = in_first_step_res[-1].time
-        for _ in in_second_step_res:
-            res.append(odg.RowType(
-                _.data, _.time+first_step_end_time))
-        return res
-
-    opt_res_dict = {}
-    opt_res_dict[in_first_step_tex_name] = \
-        odg.generate_multiple_shape_optimisation_data(
-            in_first_step_representation, in_shape_list, 3,
+def _run_continuation_level(in_shape_list, in_representation, in_x0, in_level):
+    if in_level == 0:
+        return _RESULT_STORE.generate(
+            odg.generate_multiple_shape_optimisation_data,
+            in_representation, in_shape_list, 3,
             {'maxiter': 230},
-            {'maxiter': 40})
-
-    raw_first_step_opt, second_step_representation = \
-        _get_initial_data_for_second_step(
-            in_first_step_representation, opt_res_dict[in_first_step_tex_name])
-
-    opt_res_dict[in_second_step_tex_name] = \
-        odg.generate_multiple_shape_optimisation_data(
-            second_step_representation, in_shape_list, 3,
-            {'maxiter': 60, 'x0': raw_first_step_opt, 'initial_temp': 10},
-            {'maxiter': 20, 'initial_temp': 10})
-    opt_res_dict[in_second_step_tex_name] = shift_second_step_time(
-        opt_res_dict[in_first_step_tex_name],
-        opt_res_dict[in_second_step_tex_name])
-
-    curve_eval_fun_dict = {
-        in_first_step_tex_name:
-            ev.get_multiple_shape_evaluator(
-                in_first_step_representation, in_shape_list,
-                10).evaluate_curve_max,
-        in_second_step_tex_name:
-            ev.get_multiple_shape_evaluator(
-                second_step_representation, in_shape_list,
-                10).evaluate_curve_max}
-
-    data_rep_dict = {
-        in_first_step_tex_name: in_first_step_representation,
-        in_second_step_tex_name: second_step_representation}
-
-    for (cur_tex_name, cur_opt_res) in opt_res_dict.items():
-        _create_optimisation_animation(
-            cur_tex_name, cur_opt_res,
-            data_rep_dict[cur_tex_name],
-            lambda: None,
-            curve_eval_fun_dict[cur_tex_name],
-            **kwargs)
-
-    _create_conv_comparison_plot(
-        opt_res_dict,
-        {
-            in_first_step_tex_name:
-                ev.get_multiple_shape_evaluator(
-                    in_first_step_representation, in_shape_list,
-                    10).evaluate_data_max,
-            in_second_step_tex_name:
-                ev.get_multiple_shape_evaluator(
-                    second_step_representation, in_shape_list,
-                    10).evaluate_data_max,
-        },
-        in_conv_plot_tex_name)
-
-
-class _Rectangle:
-    def __init__(self, in_xy_data):
-        self._xy_data = in_xy_data
-        self._patch_data = plt.Polygon(self._xy_data)
-
-    def __contains__(self, in_pos):
-        return self._patch_data.contains_point(in_pos)
+            {'maxiter': 40},
+            cache_capacity=4096)
+    return _RESULT_STORE.generate(
+        odg.generate_multiple_shape_optimisation_data,
+        in_representation, in_shape_list, 3,
+        {'maxiter': 60, 'x0': in_x0, 'initial_temp': 10},
+        {'maxiter': 20, 'initial_temp': 10},
+        cache_capacity=4096)
+
+
+def continuation_scheme(
+        in_shape_list, in_first_representation,
+        in_level_tex_names, in_conv_plot_tex_name, **kwargs):
+    """
+    runs the coarse-to-fine continuation scheme
+    with one level for every name in in_level_tex_names
+    """
+    level_list = oc.generate_continuation_data(
+        lambda *args: _run_continuation_level(in_shape_list, *args),
+        in_first_representation, len(in_level_tex_names), 0.5)
 
-    def plot(self, **kwargs):
-        """plots the represented rectangle"""
-        plt.gca().add_patch(plt.Polygon(self._xy_data, **kwargs))
+    _create_multiple_shape_plots(
+        {_n: _l.opt_data for (_n, _l) in zip(in_level_tex_names, level_list)},
+        {_n: _l.representation
+         for (_n, _l) in zip(in_level_tex_names, level_list)},
+        in_shape_list, in_conv_plot_tex_name, **kwargs)
 
 
 def _get_data_for_strip(in_shift_num, in_rotation_num):
     x_rad = 4
-    initial_xy_data = numpy.array(
-        [[-x_rad, 0.5], [x_rad, 0.5], [x_rad, -0.5], [-x_rad, -0.5]])
-    res_list = []
     all_angles = numpy.linspace(
         0, numpy.radians(180), in_rotation_num, endpoint=False)
-    for y_shift in numpy.linspace(-0.4995, 0.4995, in_shift_num):
-        cur_shift = numpy.array([0, y_shift])
-        for cur_rot in all_angles:
-            cur_xy = [
-                rotations.rotate_2d(_, cur_rot)+cur_shift
-                for _ in initial_xy_data]
-            cur_shape = _Rectangle(cur_xy)
-            assert numpy.array([0, 0]) in cur_shape
-            res_list.append(cur_shape)
-    return res_list
+    all_y_shifts = numpy.linspace(-0.4995, 0.4995, in_shift_num)
+    res = sf.ShapeFamily(
+        cs.Rectangle(numpy.array([0.0, 0.0]), 2*x_rad, 1.0),
+        numpy.tile(all_angles, in_shift_num),
+        numpy.stack(
+            (numpy.zeros(in_shift_num*in_rotation_num),
+             numpy.repeat(all_y_shifts, in_rotation_num)), axis=1))
+    assert res.contains_many(numpy.zeros((1, 2))).all()
+    return res
 
 
 def _get_data_for_halfplane(in_rotation_num):
     margin_size = 20
     x_shift = -0.995
-    initial_xy_data = numpy.array(
-        [[-margin_size, margin_size], [margin_size, margin_size],
-         [margin_size, x_shift], [-margin_size, x_shift]])
-    res_list = []
-    for cur_rot in numpy.linspace(
-            0, 2*numpy.pi, in_rotation_num, endpoint=False):
-        cur_xy = [rotations.rotate_2d(_, cur_rot) for _ in initial_xy_data]
-        cur_shape = _Rectangle(cur_xy)
-        assert numpy.array([0, 0]) in cur_shape
-        res_list.append(cur_shape)
-    return res_list
+    res = sf.ShapeFamily(
+        cs.Rectangle(
+            numpy.array([0.0, (margin_size+x_shift)/2]),
+            2*margin_size, margin_size-x_shift),
+        numpy.linspace(0, 2*numpy.pi, in_rotation_num, endpoint=False))
+    assert res.contains_many(numpy.zeros((1, 2))).all()
+    return res
 
 
 PlotLimits = collections.namedtuple('PlotLimits', ['xlim', 'ylim'])
@@ -332,7 +285,8 @@ def _get_simple_limits(in_r):
 
 CURVE_REP_PARAMS = (30, 2,)
 
-make_single_shape_plots(
+if __name__ == '__main__':
+    make_single_shape_plots(
         pcs.Wheel(numpy.array([0.0, 0.0]), 1.0),
         {
             'escapeFromCircleLogoTex':
@@ -343,7 +297,7 @@ make_single_shape_plots(
         'escapeFromCircleConvPlotTex',
         _get_simple_limits(1.15))
 
-make_single_shape_plots(
+    make_single_shape_plots(
         pcs.Wheel(numpy.array([0.0, 0.0]), 1.0),
         {
             'escapeFromCircleLogoFixedTex':
@@ -354,7 +308,7 @@ make_single_shape_plots(
         'escapeFromCircleConvPlotFixedTex',
         _get_simple_limits(1.15))
 
-make_single_shape_plots(
+    make_single_shape_plots(
         pcs.Rectangle(numpy.array([0, 0]), 2.0, 1.8),
         {
             'escapeFromRectangleLogoTex':
@@ -365,16 +319,15 @@ make_single_shape_plots(
         'escapeFromRectangleConvPlotTex',
         _get_simple_limits(1.3))
 
-make_multiple_shape_plots(
-    _get_data_for_strip(30, 15),
-    {'escapeFromStripAzimuthTex': cr.AzimuthRepresentation(20, 2.5)},
-    'escapeFromStripConvPlotTex',
-    _get_simple_limits(1.7))
-
-two_step_scheme(
-    _get_data_for_halfplane(30),
-    cr.AzimuthRepresentation(20, 7),
-    'escapeFromHalfplaneAzimuthTex',
-    'escapeFromHalfplanePointTex',
-    'escapeFromHalfplaneConvPlotTex',
-    plot_limits=_get_simple_limits(2.25))
+    make_multiple_shape_plots(
+        _get_data_for_strip(30, 15),
+        {'escapeFromStripAzimuthTex': cr.AzimuthRepresentation(20, 2.5)},
+        'escapeFromStripConvPlotTex',
+        _get_simple_limits(1.7))
+
+    continuation_scheme(
+        _get_data_for_halfplane(30),
+        cr.AzimuthRepresentation(20, 7),
+        ['escapeFromHalfplaneAzimuthTex', 'escapeFromHalfplanePointTex'],
+        'escapeFromHalfplaneConvPlotTex',
+        plot_limits=_get_simple_limits(2.25))
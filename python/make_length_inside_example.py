@@ -9,6 +9,7 @@ import scipy.spatial
 
 import output_paths as op
 import curve
+import frame_renderer as fr
 import project_styles as ps
 import tex_string_utils as tsu
 
@@ -49,9 +50,13 @@ def _init_figure():
     plt.axis('off')
 
 
+def _get_limits():
+    return {'xlim': [-1.1, 5.1], 'ylim': [-2.2, 3.95]}
+
+
 def _set_limits():
-    plt.gca().set_xlim([-1.1, 5.1])
-    plt.gca().set_ylim([-2.2, 3.95])
+    plt.gca().set_xlim(_get_limits()['xlim'])
+    plt.gca().set_ylim(_get_limits()['ylim'])
 
 
 def find_last_inside(in_set, in_curve):
@@ -82,26 +87,30 @@ def _get_example_curve_plot_params():
     return {'marker': 'o', 'color': [0.3, 0.3, 0.3], 'linestyle': ':'}
 
 
-def _draw_frame(in_frame_num):
+def _draw_static():
+    plot_shape(
+        _get_raw_convex_shape(), **ps.CONVEX_COLORS)
+    plt.plot(
+        _get_example_curve().x_list,
+        _get_example_curve().y_list,
+        **_get_example_curve_plot_params())
+
+
+def _draw_frame(in_renderer, in_frame_num):
     example_curve = _get_example_curve()
     example_patch = matplotlib.patches.Polygon(_get_raw_convex_shape())
     assert example_patch.contains_point(example_curve.point_list[0])
     assert not example_patch.contains_point(example_curve.point_list[-1])
 
-    _init_figure()
-    plot_shape(
-        _get_raw_convex_shape(), **ps.CONVEX_COLORS)
-    plt.plot(
-        example_curve.x_list,
-        example_curve.y_list,
-        **_get_example_curve_plot_params())
+    in_renderer.start_frame()
     last_inside = find_last_inside(example_patch, example_curve)
 
     logo_curve_inside_style = {
         'marker': 'o', 'color': 'orange', 'linestyle': '-', 'linewidth': 1.5}
 
     def plot_curve_inside(in_limit):
-        plt.plot(
+        in_renderer.plot(
+            'inside',
             example_curve.x_list[0:in_limit],
             example_curve.y_list[0:in_limit],
             **logo_curve_inside_style)
@@ -115,11 +124,13 @@ def _draw_frame(in_frame_num):
                 pos_inside = mid_pos
             else:
                 pos_outside = mid_pos
-        plt.plot(
+        in_renderer.plot(
+            'bisection',
             [in_pos_inside[0], pos_inside[0]],
             [in_pos_inside[1], pos_inside[1]],
             **logo_curve_inside_style)
-        plt.plot(
+        in_renderer.plot(
+            'bisection_ends',
             [pos_outside[0], pos_inside[0]],
             [pos_outside[1], pos_inside[1]],
             marker='.', color='red', markersize=8, linestyle='none')
@@ -133,14 +144,14 @@ def _draw_frame(in_frame_num):
             example_curve.point_list[last_inside+1],
             in_frame_num-last_inside-2)
 
-    _set_limits()
-    _call_save_fig(in_frame_num, _get_output_paths_convex())
-    plt.close()
+    in_renderer.save(
+        _get_output_paths_convex().get_pdf_file_path(in_frame_num))
 
 
 NUMBER_OF_FRAMES = 15
-for _ in range(NUMBER_OF_FRAMES):
-    _draw_frame(_)
+with fr.FrameRenderer(_draw_static, **_get_limits()) as RENDERER:
+    for _ in range(NUMBER_OF_FRAMES):
+        _draw_frame(RENDERER, _)
 tsu.save_simple_overprint_frame(
     _get_output_paths_convex(), NUMBER_OF_FRAMES, 0.5)
 
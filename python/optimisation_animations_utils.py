@@ -2,10 +2,26 @@
 utilities related to creation of animations illustrating
 the optimisation process
 """
+import collections
+import concurrent.futures
+import functools
 import numpy
 
+import matplotlib
 import matplotlib.pyplot as plt
 
+import frame_renderer as fr
+
+AnimationSpec = collections.namedtuple(
+    'AnimationSpec',
+    ['data_representation', 'curve_color', 'draw_background_fun',
+     'plot_limits'])
+
+FrameSpec = collections.namedtuple(
+    'FrameSpec', ['data', 'curve_length', 'pdf_path'])
+
+_FRAME_CHUNK_SIZE = 16
+
 
 def _find_last_node_num(curve_data, in_len):
     cur_len = 0
@@ -21,36 +37,85 @@ def _find_last_node_num(curve_data, in_len):
     return cur_node_num-1, prev_len, last_segment_len
 
 
-def _plot_curve(curve_data, in_length, in_curve_color):
+def _get_curve_lines(curve_data, in_length):
+    """
+    returns the x and y lists of the unused part of the curve (or None)
+    and of its part of the length in_length
+    """
     last_node_num, lower_len, last_segment_len = \
         _find_last_node_num(curve_data, in_length)
     rem_len = in_length-lower_len
-    assert 0 <= rem_len < last_segment_len
+    assert 0 <= rem_len <= last_segment_len
+    rem_line = None
     if len(curve_data.point_list) > last_node_num:
-        plt.plot(
+        rem_line = (
             curve_data.x_list[last_node_num:],
-            curve_data.y_list[last_node_num:],
-            color='lightgray')
-    pos_a = numpy.array(curve_data.point_list[last_node_num])
-    pos_b = numpy.array(curve_data.point_list[last_node_num+1])
+            curve_data.y_list[last_node_num:])
+    used_points = numpy.array(
+        [curve_data[_] for _ in range(last_node_num+2)])
+    pos_a = used_points[-2]
+    pos_b = used_points[-1]
     pos_c = pos_a+(rem_len/last_segment_len)*(pos_b-pos_a)
-    used_x_list = list(curve_data.x_list[0:last_node_num+1]) + \
-        [pos_a[0], pos_c[0]]
-    used_y_list = list(curve_data.y_list[0:last_node_num+1]) + \
-        [pos_a[1], pos_c[1]]
-    plt.plot(used_x_list, used_y_list, color=in_curve_color)
-
-
-def plot_data(
-        in_data_representation, in_data, in_evaluate_function, in_curve_color):
-    """plots the curve represented by in_data"""
-    cur_curve = in_data_representation.to_curve(in_data)
-    used_curve_length = in_evaluate_function(cur_curve)
-    _plot_curve(cur_curve, used_curve_length, in_curve_color)
-
-
-def plot_conv_data(in_data, in_evaluate_function, **kwargs):
-    """plots the convergence data into current figure"""
-    x_data = [_.time for _ in in_data]
-    y_data = [in_evaluate_function(_.data) for _ in in_data]
-    plt.plot(x_data, y_data, **kwargs)
+    used_x_list = list(used_points[:-1, 0]) + [pos_a[0], pos_c[0]]
+    used_y_list = list(used_points[:-1, 1]) + [pos_a[1], pos_c[1]]
+    return rem_line, (used_x_list, used_y_list)
+
+
+def draw_frames(in_animation_spec, in_frame_specs):
+    """
+    draws the curves of the frames given by in_frame_specs
+    in a single persistent figure and saves them to their pdf_path,
+    draw_background_fun of in_animation_spec (picklable or None)
+    draws the static background,
+    plot_limits is None or the pair of the x and y limits
+    """
+    plot_limits = in_animation_spec.plot_limits
+    with fr.FrameRenderer(
+            in_animation_spec.draw_background_fun,
+            figsize=(3.2, 3.2),
+            xlim=None if plot_limits is None else plot_limits[0],
+            ylim=None if plot_limits is None else plot_limits[1]) \
+            as renderer:
+        # creates the lines in the drawing order
+        renderer.plot('rem', [], [], color='lightgray')
+        renderer.plot('used', [], [], color=in_animation_spec.curve_color)
+        for cur_spec in in_frame_specs:
+            renderer.start_frame()
+            rem_line, used_line = _get_curve_lines(
+                in_animation_spec.data_representation.to_curve(
+                    cur_spec.data),
+                cur_spec.curve_length)
+            if rem_line is not None:
+                renderer.plot('rem', *rem_line)
+            renderer.plot('used', *used_line)
+            renderer.save(cur_spec.pdf_path)
+
+
+def render_frames(in_animation_spec, in_frame_specs, max_workers=1):
+    """
+    draws the frames given by in_frame_specs (see draw_frames)
+    in chunks of _FRAME_CHUNK_SIZE frames
+    in a pool of max_workers processes (None for the number of CPUs)
+    using the Agg backend or in the current process if max_workers is 1
+    """
+    if max_workers == 1:
+        draw_frames(in_animation_spec, in_frame_specs)
+        return
+    chunks = [
+        in_frame_specs[_:_+_FRAME_CHUNK_SIZE]
+        for _ in range(0, len(in_frame_specs), _FRAME_CHUNK_SIZE)]
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers,
+            initializer=matplotlib.use, initargs=('Agg',)) as executor:
+        for _ in executor.map(
+                functools.partial(draw_frames, in_animation_spec), chunks):
+            pass
+
+
+def plot_conv_values(in_data, in_value_list, **kwargs):
+    """
+    plots the convergence data with already evaluated values
+    into current figure
+    """
+    assert len(in_data) == len(in_value_list)
+    plt.plot([_.time for _ in in_data], in_value_list, **kwargs)
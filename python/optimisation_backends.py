@@ -0,0 +1,192 @@
+"""
+contains the registry of the optimisers used to generate the optimisation data,
+every backend is a function
+minimise(in_fun, in_batch_fun, in_bounds, in_callback, **kwargs)
+minimising in_fun (evaluating a single point) or in_batch_fun
+(evaluating the rows of a matrix), calling in_callback(x, value)
+for the new best points and returning the pair of the best point and its value,
+the gradient of in_fun may be given as the keyword argument jac
+"""
+import collections
+import math
+import numpy
+import scipy.optimize
+
+
+def minimise_dual_annealing(
+        in_fun, _in_batch_fun, in_bounds, in_callback, **kwargs):
+    """
+    minimises in_fun using scipy.optimize.dual_annealing,
+    jac is passed to its local minimiser
+    """
+    if 'jac' in kwargs:
+        kwargs['minimizer_kwargs'] = {
+            'jac': kwargs.pop('jac'), **kwargs.get('minimizer_kwargs', {})}
+    opt_res = scipy.optimize.dual_annealing(
+        in_fun, in_bounds,
+        callback=lambda x, value, _context: in_callback(x, value),
+        **kwargs)
+    return opt_res.x, opt_res.fun
+
+
+def minimise_differential_evolution(
+        _in_fun, in_batch_fun, in_bounds, in_callback, **kwargs):
+    """
+    minimises in_batch_fun using scipy.optimize.differential_evolution,
+    the whole population is evaluated in a single call of in_batch_fun,
+    maxfun limits the number of the generations (and disables polishing
+    unless polish is given), jac is not used
+    """
+    kwargs.pop('jac', None)
+    maxfun = kwargs.pop('maxfun', numpy.inf)
+    if maxfun < numpy.inf:
+        pop_size = kwargs.get('popsize', 15)*len(in_bounds)
+        kwargs['maxiter'] = min(
+            kwargs.get('maxiter', 1000), max(0, int(maxfun)//pop_size-1))
+        kwargs.setdefault('polish', False)
+    best_value = [numpy.inf]
+
+    def callback_fun(intermediate_result):
+        if intermediate_result.fun < best_value[0]:
+            best_value[0] = intermediate_result.fun
+            in_callback(intermediate_result.x, intermediate_result.fun)
+
+    opt_res = scipy.optimize.differential_evolution(
+        lambda x: in_batch_fun(numpy.atleast_2d(x.T)),
+        in_bounds,
+        callback=callback_fun,
+        vectorized=True,
+        updating='deferred',
+        **kwargs)
+    return opt_res.x, opt_res.fun
+
+
+_CmaParameters = collections.namedtuple(
+    '_CmaParameters',
+    ['popsize', 'weights', 'mueff', 'c_c', 'c_s', 'c_1', 'c_mu',
+     'damps', 'chi_n'])
+
+
+def _get_cma_parameters(in_dim, in_popsize):
+    weights = math.log((in_popsize+1)/2)-numpy.log(
+        numpy.arange(1, in_popsize//2+1))
+    weights = weights/weights.sum()
+    mueff = 1/(weights**2).sum()
+    c_s = (mueff+2)/(in_dim+mueff+5)
+    c_1 = 2/((in_dim+1.3)**2+mueff)
+    return _CmaParameters(
+        in_popsize, weights, mueff,
+        (4+mueff/in_dim)/(in_dim+4+2*mueff/in_dim),
+        c_s,
+        c_1,
+        min(1-c_1, 2*(mueff-2+1/mueff)/((in_dim+2)**2+mueff)),
+        1+2*max(0, math.sqrt((mueff-1)/(in_dim+1))-1)+c_s,
+        math.sqrt(in_dim)*(1-1/(4*in_dim)+1/(21*in_dim**2)))
+
+
+class _CmaState:
+    """state of CMA-ES in the unit cube"""
+    def __init__(self, in_mean, in_sigma, in_popsize):
+        self.params = _get_cma_parameters(len(in_mean), in_popsize)
+        self.mean = in_mean
+        self.sigma = in_sigma
+        self._cov = numpy.eye(len(in_mean))
+        self._path_c = numpy.zeros(len(in_mean))
+        self._path_s = numpy.zeros(len(in_mean))
+        self._eigen = (numpy.ones(len(in_mean)), numpy.eye(len(in_mean)))
+
+    def get_max_step(self):
+        """returns the largest standard deviation of the sampled steps"""
+        return self.sigma*self._eigen[0].max()
+
+    def sample(self, in_rng):
+        """returns the population clipped to the unit cube"""
+        eig_vals, eig_vecs = numpy.linalg.eigh(self._cov)
+        self._eigen = (numpy.sqrt(numpy.maximum(eig_vals, 1e-20)), eig_vecs)
+        return numpy.clip(
+            self.mean+self.sigma*(
+                in_rng.standard_normal((self.params.popsize, len(self.mean)))
+                * self._eigen[0])@self._eigen[1].T,
+            0, 1)
+
+    def update(self, in_points, in_values, in_iter_num):
+        """adapts the state to the evaluated population"""
+        params = self.params
+        dim = len(self.mean)
+        steps = (in_points[
+            numpy.argsort(in_values)[:len(params.weights)]]-self.mean) \
+            / self.sigma
+        mean_step = params.weights@steps
+        self.mean = self.mean+self.sigma*mean_step
+        self._path_s = (1-params.c_s)*self._path_s+math.sqrt(
+            params.c_s*(2-params.c_s)*params.mueff) * \
+            self._eigen[1]@((self._eigen[1].T@mean_step)/self._eigen[0])
+        is_stalled = numpy.linalg.norm(self._path_s) / math.sqrt(
+            1-(1-params.c_s)**(2*(in_iter_num+1))) / params.chi_n \
+            >= 1.4+2/(dim+1)
+        self._path_c = (1-params.c_c)*self._path_c+(not is_stalled)*math.sqrt(
+            params.c_c*(2-params.c_c)*params.mueff)*mean_step
+        self._cov = (1-params.c_1-params.c_mu)*self._cov \
+            + params.c_1*(
+                numpy.outer(self._path_c, self._path_c)
+                + is_stalled*params.c_c*(2-params.c_c)*self._cov) \
+            + params.c_mu*(steps.T*params.weights)@steps
+        self.sigma *= math.exp(
+            params.c_s/params.damps
+            * (numpy.linalg.norm(self._path_s)/params.chi_n-1))
+
+
+def minimise_cma_es(
+        _in_fun, in_batch_fun, in_bounds, in_callback, **kwargs):
+    """
+    minimises in_batch_fun using the (mu/mu_w, lambda)-CMA-ES
+    in the coordinates scaled to the unit cube,
+    the sampled points are clipped to in_bounds,
+    kwargs: x0, sigma0 (in the scaled coordinates), popsize,
+    maxiter, maxfun, tol (the smallest step size) and seed,
+    jac is not used
+    """
+    bounds = numpy.array(in_bounds, dtype=float)
+    lower, width = bounds[:, 0], bounds[:, 1]-bounds[:, 0]
+    rng = numpy.random.default_rng(kwargs.get('seed', None))
+    state = _CmaState(
+        rng.uniform(size=len(bounds)) if kwargs.get('x0', None) is None
+        else (numpy.asarray(kwargs['x0'], dtype=float)-lower)/width,
+        kwargs.get('sigma0', 0.3),
+        kwargs.get('popsize', 4+int(3*math.log(len(bounds)))))
+    best_x, best_value = None, numpy.inf
+    for iter_num in range(kwargs.get('maxiter', 1000)):
+        points = state.sample(rng)
+        values = numpy.asarray(in_batch_fun(lower+points*width))
+        if values.min() < best_value:
+            best_x, best_value = \
+                lower+points[values.argmin()]*width, values.min()
+            in_callback(best_x, best_value)
+        state.update(points, values, iter_num)
+        if (iter_num+1)*state.params.popsize >= \
+                kwargs.get('maxfun', numpy.inf) or \
+                state.get_max_step() < kwargs.get('tol', 1e-12):
+            break
+    return best_x, best_value
+
+
+_BACKENDS = {
+    'dual_annealing': minimise_dual_annealing,
+    'differential_evolution': minimise_differential_evolution,
+    'cma_es': minimise_cma_es}
+
+
+def register_backend(in_name, in_minimise_fun):
+    """adds in_minimise_fun to the registered backends"""
+    _BACKENDS[in_name] = in_minimise_fun
+
+
+def get_backend(in_name):
+    """returns the backend registered as in_name"""
+    assert in_name in _BACKENDS
+    return _BACKENDS[in_name]
+
+
+def get_backend_names():
+    """returns the names of the registered backends"""
+    return list(_BACKENDS)
@@ -0,0 +1,70 @@
+"""
+contains the coarse-to-fine continuation of the curve optimisation:
+the optimal curve of every level is upsampled and its points are optimised
+at the next level within the bounds shrinking around them
+"""
+import collections
+import numpy
+
+import curve_representations as cr
+import optimisation_data_generators as odg
+
+ContinuationLevel = collections.namedtuple(
+    'ContinuationLevel', ['representation', 'opt_data'])
+
+
+def upsample_points(in_point_array, in_factor=2):
+    """
+    returns the points of the curve with every segment
+    divided into in_factor equal segments
+    """
+    fractions = numpy.arange(in_factor)/in_factor
+    res = in_point_array[:-1, numpy.newaxis, :] \
+        + fractions[numpy.newaxis, :, numpy.newaxis] \
+        * numpy.diff(in_point_array, axis=0)[:, numpy.newaxis, :]
+    return numpy.concatenate(
+        (res.reshape(-1, 2), in_point_array[-1:]), axis=0)
+
+
+def get_refined_representation(
+        in_representation, in_data, in_bound_radius, in_factor=2):
+    """
+    returns the PointCurveRepresentation of the upsampled curve
+    represented by in_data with the bounds of the width 2*in_bound_radius
+    centred at its points together with the data of the upsampled curve
+    """
+    refined_data = upsample_points(
+        in_representation.to_curves_batch([in_data])[0], in_factor)[1:].ravel()
+    return cr.PointCurveRepresentation(
+        len(refined_data),
+        refined_data-in_bound_radius,
+        refined_data+in_bound_radius), refined_data
+
+
+def generate_continuation_data(
+        in_run_level_fun, in_representation, in_level_num,
+        in_bound_radius, **kwargs):
+    """
+    returns the list of the ContinuationLevel objects of in_level_num levels,
+    the optimisation data of a level is in_run_level_fun(representation, x0,
+    level_num), where x0 is None at the first level
+    using in_representation and the refined data of the previous level
+    otherwise, the number of the segments grows kwargs['factor'] (2) times
+    and the bound radius kwargs['shrink_factor'] (0.5) times every level,
+    the times of every level are shifted by the end time of the previous one
+    """
+    res = []
+    cur_representation = in_representation
+    x0 = None
+    for level_num in range(in_level_num):
+        if res:
+            cur_representation, x0 = get_refined_representation(
+                res[-1].representation, res[-1].opt_data[-1].data,
+                in_bound_radius*kwargs.get('shrink_factor', 0.5)
+                ** (level_num-1),
+                kwargs.get('factor', 2))
+        opt_data = in_run_level_fun(cur_representation, x0, level_num)
+        if res:
+            opt_data = odg.shift_time(opt_data, res[-1].opt_data[-1].time)
+        res.append(ContinuationLevel(cur_representation, opt_data))
+    return res
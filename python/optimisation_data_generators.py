@@ -1,63 +1,454 @@
 """contains utilities releated to generation of the optimsation data"""
 
+import hashlib
+import os
+import pathlib
+import pickle
 import time
 import collections
-import scipy.optimize
+import concurrent.futures
+import numpy
 
 import evaluators as ev
+import optimisation_backends as ob
 
 
-RowType = collections.namedtuple('RowType', ['data', 'time'])
+RowType = collections.namedtuple(
+    'RowType', ['data', 'time', 'value', 'result', 'eval_count'],
+    defaults=(None, None, None))
 
+# the options of an _OptimisationRun
+_RUN_OPTION_NAMES = (
+    # the seed of the random generator used by all of the steps
+    'seed',
+    # the Checkpoint the state of the run is saved to and resumed from
+    'checkpoint',
+    # the list-like object (e.g. a Trajectory) the rows are appended to
+    'sink',
+    # the run stops after this number of seconds or evaluations,
+    # the best point of the stopped step is its result
+    'time_limit', 'eval_limit',
+    # a step stops after this number of evaluations
+    # without an improvement of its best value
+    'stagnation_limit',
+    # the PrecisionSchedule replacing the fixed iteration limit
+    'precision_schedule',
+    # the local searches use the analytic gradients (if available)
+    'use_gradient')
 
-def _append_res_data(cur_data, in_opt_res, in_start_time):
-    cur_data.append(RowType(in_opt_res.x, time.time()-in_start_time))
+_Problem = collections.namedtuple(
+    '_Problem',
+    ['bounds', 'result_fun', 'evaluator', 'cache_list', 'fingerprint'])
 
+MultiStartResult = collections.namedtuple(
+    'MultiStartResult', ['best_data', 'merged_data', 'chain_data_list'])
 
-def _get_callback_fun(cur_data, in_start_time):
-    def callback_fun(in_data, _function_value, _context):
-        cur_data.append(RowType(in_data, time.time()-in_start_time))
-    return callback_fun
+
+class Checkpoint:
+    """
+    file storing the state of an optimisation run
+    together with the fingerprint of its problem,
+    the state is saved at most every in_interval seconds
+    and after every finished step,
+    a resumed run skips the finished steps and restarts the interrupted one
+    from its best point with the remaining maxfun budget
+    """
+    def __init__(self, in_path, in_interval=60.0):
+        self.path = pathlib.Path(in_path)
+        self.interval = in_interval
+
+    def get_chain_checkpoint(self, in_chain_num):
+        """returns the Checkpoint of the chain in_chain_num of a multistart"""
+        return Checkpoint(
+            self.path.with_name(
+                f'{self.path.stem}_{in_chain_num}{self.path.suffix}'),
+            self.interval)
+
+    def exists(self):
+        """checks if the state was saved"""
+        return self.path.exists()
+
+    def load(self):
+        """returns the saved state"""
+        with open(self.path, 'rb') as state_file:
+            return pickle.load(state_file)
+
+    def save(self, in_state):
+        """atomically replaces the saved state with in_state"""
+        tmp_path = self.path.with_name(self.path.name+'.tmp')
+        with open(tmp_path, 'wb') as state_file:
+            pickle.dump(in_state, state_file)
+        os.replace(tmp_path, self.path)
+
+
+class PrecisionSchedule:  # pylint: disable=too-few-public-methods
+    """
+    increasing iteration limits of the boundary searches used in a step:
+    the next limit is used when the step spends the next equal part
+    of its maxfun budget or when its best value does not improve
+    during in_stagnation_limit evaluations,
+    the best points of the step are re-scored with the last limit
+    """
+    def __init__(self, in_iter_limits, in_stagnation_limit=numpy.inf):
+        self.iter_limits = tuple(in_iter_limits)
+        self.stagnation_limit = in_stagnation_limit
+
+    def get_level(self, in_level, in_progress, in_stagnation_count):
+        """
+        returns the index of the iteration limit for the step
+        which used in_progress part of its budget
+        """
+        res = max(in_level, int(in_progress*len(self.iter_limits)))
+        if in_stagnation_count >= self.stagnation_limit:
+            res += 1
+        return min(res, len(self.iter_limits)-1)
+
+
+class _StepStopped(Exception):
+    """raised when an optimisation step reaches one of its limits"""
+
+
+class _OptimisationRun:
+    """optimisation run of consecutive steps (see _RUN_OPTION_NAMES)"""
+    def __init__(self, in_problem, in_options):
+        self._problem = in_problem
+        self._options = in_options
+        self._rng = numpy.random.default_rng(in_options.get('seed', None))
+        self._state = {
+            'opt_data': in_options.get('sink', []), 'eval_count': 0,
+            'finished_step_num': 0, 'step_eval_count': 0,
+            'step_best': None, 'stagnation_count': 0, 'last_x': None,
+            'step_row_start': 0, 'step_maxfun': numpy.inf,
+            'precision_level': 0, 'time': 0.0}
+        if self._get_checkpoint() is not None and \
+                self._get_checkpoint().exists():
+            self._state = self._get_checkpoint().load()
+            if self._state.pop('fingerprint', None) != \
+                    in_problem.fingerprint:
+                raise ValueError(
+                    f'{self._get_checkpoint().path} is a checkpoint'
+                    ' of a different problem')
+            self._rng.bit_generator.state = self._state.pop('rng_state')
+        self._start_time = time.time()-self._state['time']
+        self._last_save_time = time.time()
+
+    @property
+    def opt_data(self):
+        """returns the rows of the run"""
+        return self._state['opt_data']
+
+    def _get_checkpoint(self):
+        return self._options.get('checkpoint', None)
+
+    def _save(self):
+        if self._get_checkpoint() is None:
+            return
+        self._state['time'] = time.time()-self._start_time
+        self._get_checkpoint().save({
+            **self._state, 'rng_state': self._rng.bit_generator.state,
+            'fingerprint': self._problem.fingerprint})
+        self._last_save_time = time.time()
+
+    def _save_if_due(self):
+        if self._get_checkpoint() is not None and \
+                time.time()-self._last_save_time >= \
+                self._get_checkpoint().interval:
+            self._save()
+
+    def is_budget_exhausted(self):
+        """checks if the run reached its time or evaluation limit"""
+        return \
+            self._state['eval_count'] >= \
+            self._options.get('eval_limit', numpy.inf) or \
+            time.time()-self._start_time >= \
+            self._options.get('time_limit', numpy.inf)
+
+    def _append_row(self, in_data, in_value):
+        self._state['opt_data'].append(RowType(
+            in_data, time.time()-self._start_time, in_value,
+            None if self._problem.result_fun is None
+            else self._problem.result_fun(in_data),
+            self._state['eval_count']))
+
+    def _record_values(self, in_data_matrix, in_values):
+        self._state['eval_count'] += len(in_values)
+        self._state['step_eval_count'] += len(in_values)
+        self._state['stagnation_count'] += len(in_values)
+        if self._state['step_best'] is None or \
+                in_values.min() < self._state['step_best'][0]:
+            self._state['step_best'] = (
+                in_values.min(),
+                numpy.array(in_data_matrix[in_values.argmin()]))
+            self._state['stagnation_count'] = 0
+        self._update_precision()
+        self._save_if_due()
+        if self.is_budget_exhausted() or self._state['stagnation_count'] >= \
+                self._options.get('stagnation_limit', numpy.inf):
+            raise _StepStopped
+
+    def _set_precision_level(self, in_level):
+        self._problem.evaluator.set_iter_limit(
+            self._options['precision_schedule'].iter_limits[in_level])
+        for _ in self._problem.cache_list:
+            _.clear()
+        self._state['precision_level'] = in_level
+
+    def _update_precision(self):
+        schedule = self._options.get('precision_schedule', None)
+        if schedule is None:
+            return
+        level = schedule.get_level(
+            self._state['precision_level'],
+            self._state['step_eval_count']/self._state['step_maxfun'],
+            self._state['stagnation_count'])
+        if level != self._state['precision_level']:
+            self._set_precision_level(level)
+            self._state['step_best'] = (
+                numpy.inf, self._state['step_best'][1])
+            self._state['stagnation_count'] = 0
+
+    def _rescore(self, in_value_fun, in_best_x):
+        self._set_precision_level(
+            len(self._options['precision_schedule'].iter_limits)-1)
+        candidates = [in_best_x]+[
+            _.data for _ in
+            self._state['opt_data'][self._state['step_row_start']:]]
+        values = [in_value_fun(_) for _ in candidates]
+        self._state['eval_count'] += len(candidates)
+        return candidates[numpy.argmin(values)], min(values)
+
+    def _evaluate(self, in_value_fun, in_data):
+        res = in_value_fun(in_data)
+        self._record_values([in_data], numpy.array([res]))
+        return res
+
+    def _evaluate_grad(self, in_value_and_grad_fun, in_data):
+        res_value, res_grad = in_value_and_grad_fun(in_data)
+        self._record_values([in_data], numpy.array([res_value]))
+        return res_grad
+
+    def _evaluate_batch(self, in_batch_value_fun, in_data_matrix):
+        res = numpy.asarray(in_batch_value_fun(in_data_matrix))
+        self._record_values(in_data_matrix, res)
+        return res
+
+    def _callback(self, in_data, in_value):
+        self._append_row(in_data, in_value)
+        self._save_if_due()
+
+    def run_step(
+            self, in_step_num, in_value_funs, in_step_args,
+            in_start_from_last=False):
+        """
+        minimises the function evaluating a point in_value_funs[0]
+        (in_value_funs[1] evaluates the rows of a matrix and the optional
+        in_value_funs[2] returns the value and the gradient at a point
+        which is passed to the backend as jac if the option use_gradient
+        is set) using the backend in_step_args['backend']
+        (dual annealing by default) with the remaining in_step_args
+        starting from the result of the previous step if in_start_from_last,
+        the step is skipped if the budget of the run is exhausted
+        """
+        if in_step_num < self._state['finished_step_num'] or \
+                self.is_budget_exhausted():
+            return
+        step_args = {'seed': self._rng, **in_step_args}
+        backend = ob.get_backend(step_args.pop('backend', 'dual_annealing'))
+        if in_start_from_last:
+            step_args['x0'] = self._state['last_x']
+        if self._state['step_best'] is None:
+            self._state.update(
+                step_row_start=len(self._state['opt_data']),
+                step_maxfun=step_args.get('maxfun', numpy.inf))
+        else:
+            step_args['x0'] = self._state['step_best'][1]
+            if 'maxfun' in step_args:
+                step_args['maxfun'] = max(
+                    1, step_args['maxfun']-self._state['step_eval_count'])
+        if len(in_value_funs) > 2 and \
+                self._options.get('use_gradient', False):
+            step_args['jac'] = \
+                lambda x: self._evaluate_grad(in_value_funs[2], x)
+        if 'precision_schedule' in self._options:
+            self._set_precision_level(self._state['precision_level'])
+        try:
+            best_x, best_value = backend(
+                lambda x: self._evaluate(in_value_funs[0], x),
+                lambda x: self._evaluate_batch(in_value_funs[1], x),
+                self._problem.bounds,
+                self._callback,
+                **step_args)
+        except _StepStopped:
+            best_value, best_x = self._state['step_best']
+        if 'precision_schedule' in self._options:
+            best_x, best_value = self._rescore(in_value_funs[0], best_x)
+            self._append_row(best_x, best_value)
+            self._set_precision_level(0)
+        else:
+            self._append_row(best_x, best_value)
+        self._state.update(
+            finished_step_num=in_step_num+1, step_eval_count=0,
+            step_best=None, stagnation_count=0, last_x=best_x)
+        self._save()
+
+
+def _get_fingerprint(*args, **kwargs):
+    """
+    returns the hash of the description of the problem,
+    the options not changing the result are skipped
+    """
+    return hashlib.sha256(pickle.dumps((
+        args,
+        {_k: _v for (_k, _v) in kwargs.items()
+         if _k not in ('checkpoint', 'sink')}))).hexdigest()
+
+
+def _get_result_fun(in_evaluate_result_fun, in_cache_capacity):
+    return ev.EvaluationCache(
+        in_evaluate_result_fun,
+        1 if in_cache_capacity is None else in_cache_capacity)
 
 
 def generate_single_shape_optimisation_data(
-        in_data_representation, in_shape, in_iter_limit, **kwargs):
-    """returns the optimisation data"""
+        in_data_representation, in_shape, in_iter_limit,
+        cache_capacity=None, incremental=False, **kwargs):
+    """
+    returns the optimisation data of the length inside in_shape,
+    cache_capacity is the capacity of the EvaluationCache of the objective
+    (None for no cache), incremental makes the evaluations reuse
+    the unchanged prefix of the previous curve,
+    kwargs are the run options (see _RUN_OPTION_NAMES)
+    and the arguments of the backend (see optimisation_backends)
+    """
     cur_evaluator = ev.get_single_shape_evaluator(
         in_data_representation, in_shape, in_iter_limit)
-    res_data = []
-    start_time = time.time()
-
-    opt_res = scipy.optimize.dual_annealing(
-        cur_evaluator.evaluate_data,
-        in_data_representation.bounds,
-        callback=_get_callback_fun(res_data, start_time),
+    evaluate_fun = cur_evaluator.evaluate_data_incremental if incremental \
+        else cur_evaluator.evaluate_data
+    cache_list = [] if cache_capacity is None else \
+        [ev.EvaluationCache(evaluate_fun, cache_capacity)]
+    fingerprint = _get_fingerprint(
+        'single_shape', in_data_representation, in_shape, in_iter_limit,
         **kwargs)
-    _append_res_data(res_data, opt_res, start_time)
-    return res_data
+    cur_run = _OptimisationRun(
+        _Problem(
+            in_data_representation.bounds, None, cur_evaluator, cache_list,
+            fingerprint),
+        {_: kwargs.pop(_) for _ in _RUN_OPTION_NAMES if _ in kwargs})
+    cur_run.run_step(
+        0,
+        (cache_list[0] if cache_list else evaluate_fun,
+         cur_evaluator.evaluate_data_batch,
+         cur_evaluator.evaluate_data_and_grad),
+        kwargs)
+    return cur_run.opt_data
 
 
+# pylint: disable-next=too-many-arguments
 def generate_multiple_shape_optimisation_data(
         in_data_representation, in_shape_list, in_iter_limit,
-        sum_step_args, max_step_args):
-    """returns the optimisation data"""
+        sum_step_args, max_step_args, *,
+        cache_capacity=None, incremental=False, **kwargs):
+    """
+    returns the optimisation data of the sum and then of the max
+    of the lengths inside the shapes,
+    cache_capacity is the capacity of the EvaluationCache of the objective
+    (None for the last evaluation only), incremental makes the evaluations
+    reuse the unchanged prefix of the previous curve,
+    kwargs are the run options (see _RUN_OPTION_NAMES), the step arguments
+    are passed to the backend (see optimisation_backends)
+    """
+    run_options = {_: kwargs.pop(_) for _ in _RUN_OPTION_NAMES if _ in kwargs}
+    if kwargs:
+        raise TypeError(f'unexpected options: {", ".join(sorted(kwargs))}')
     cur_evaluator = ev.get_multiple_shape_evaluator(
         in_data_representation, in_shape_list, in_iter_limit)
-    res_data = []
+    result_fun = _get_result_fun(
+        cur_evaluator.evaluate_data_result_incremental if incremental
+        else cur_evaluator.evaluate_data_result,
+        cache_capacity)
+    cur_run = _OptimisationRun(
+        _Problem(
+            in_data_representation.bounds, result_fun,
+            cur_evaluator, [result_fun],
+            _get_fingerprint(
+                'multiple_shape', in_data_representation, in_shape_list,
+                in_iter_limit, sum_step_args, max_step_args, **run_options)),
+        run_options)
+    cur_run.run_step(
+        0,
+        (lambda x: result_fun(x).sum, cur_evaluator.evaluate_data_batch_sum),
+        sum_step_args)
+    cur_run.run_step(
+        1,
+        (lambda x: result_fun(x).max, cur_evaluator.evaluate_data_batch_max,
+         cur_evaluator.evaluate_data_max_and_grad),
+        max_step_args,
+        in_start_from_last=True)
+    return cur_run.opt_data
+
+
+def _run_chain(in_generator_fun, in_args, in_kwargs):
     start_time = time.time()
+    return start_time, in_generator_fun(*in_args, **in_kwargs)
+
+
+def _get_chain_kwargs(in_kwargs, in_chain_num, in_seed):
+    res = {**in_kwargs, 'seed': in_seed}
+    if in_kwargs.get('checkpoint', None) is not None:
+        res['checkpoint'] = \
+            in_kwargs['checkpoint'].get_chain_checkpoint(in_chain_num)
+    return res
+
 
-    sum_opt_res = scipy.optimize.dual_annealing(
-        cur_evaluator.evaluate_data_sum,
-        in_data_representation.bounds,
-        callback=_get_callback_fun(res_data, start_time),
-        **sum_step_args)
-    _append_res_data(res_data, sum_opt_res, start_time)
-
-    max_opt_res = scipy.optimize.dual_annealing(
-        cur_evaluator.evaluate_data_max,
-        in_data_representation.bounds,
-        callback=_get_callback_fun(res_data, start_time),
-        x0=sum_opt_res.x,
-        **max_step_args)
-    _append_res_data(res_data, max_opt_res, start_time)
-    return res_data
+def get_final_value(in_opt_data):
+    """
+    returns the final value of in_opt_data: the maximum length
+    of its last row holding the result (also when the run stopped
+    in the sum step) or the value of its last row
+    """
+    last_row = in_opt_data[-1]
+    return last_row.value if last_row.result is None else last_row.result.max
+
+
+def shift_time(in_opt_data, in_time_shift):
+    """returns the rows of in_opt_data with the times shifted"""
+    return [_._replace(time=_.time+in_time_shift) for _ in in_opt_data]
+
+
+def generate_multistart_optimisation_data(
+        in_generator_fun, in_chain_num, *args,
+        seed=None, max_workers=None, **kwargs):
+    """
+    runs in_generator_fun(*args, seed=chain_seed, **kwargs) for in_chain_num
+    independently seeded chains in a process pool and returns
+    the MultiStartResult with the times measured from the start of the pool:
+    best_data is the data of the chain with the lowest final value
+    (see get_final_value),
+    merged_data contains the rows of all of the chains ordered by time,
+    chain_data_list contains the data of every chain,
+    every chain is saved to its own Checkpoint
+    derived from kwargs['checkpoint'] if it is given,
+    a sink can not be shared by the chains
+    """
+    if 'sink' in kwargs:
+        raise ValueError('the chains of a multistart can not share a sink')
+    chain_seeds = [
+        int(_.generate_state(1)[0])
+        for _ in numpy.random.SeedSequence(seed).spawn(in_chain_num)]
+    start_time = time.time()
+    with concurrent.futures.ProcessPoolExecutor(max_workers) as executor:
+        future_list = [
+            executor.submit(
+                _run_chain, in_generator_fun, args,
+                _get_chain_kwargs(kwargs, chain_num, cur_seed))
+            for (chain_num, cur_seed) in enumerate(chain_seeds)]
+        chain_data_list = [
+            shift_time(cur_data, cur_start_time-start_time)
+            for (cur_start_time, cur_data) in
+            (_.result() for _ in future_list)]
+    return MultiStartResult(
+        min(chain_data_list, key=get_final_value),
+        sorted(
+            (_ for cur_data in chain_data_list for _ in cur_data),
+            key=lambda x: x.time),
+        chain_data_list)
@@ -0,0 +1,136 @@
+"""
+contains the definition of the class ResultStore
+allowing to reuse the optimisation data of unchanged problems
+"""
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import pathlib
+import time
+import numpy
+
+import optimisation_trajectory as ot
+import project_config as pc
+
+_CODE_MODULE_NAMES = (
+    'curve', 'extendable_curve', 'escape_curve', 'convex_shapes',
+    'shape_families', 'curve_representations', 'evaluators',
+    'optimisation_data_generators', 'optimisation_backends')
+
+
+def _describe_object(in_obj):
+    class_name = \
+        f'{type(in_obj).__module__}.{type(in_obj).__qualname__}'
+    if hasattr(in_obj, '__dict__'):
+        return {'class': class_name, 'state': to_fingerprint_data(vars(in_obj))}
+    return {'class': class_name, 'repr': repr(in_obj)}
+
+
+def to_fingerprint_data(in_obj):
+    """returns a json-serialisable description of in_obj"""
+    if in_obj is None or isinstance(in_obj, (str, bool, int, float)):
+        res = in_obj
+    elif isinstance(in_obj, numpy.generic):
+        res = in_obj.item()
+    elif isinstance(in_obj, numpy.ndarray):
+        res = {'ndarray': in_obj.tolist()}
+    elif isinstance(in_obj, dict):
+        res = {
+            str(key): to_fingerprint_data(val)
+            for (key, val) in sorted(in_obj.items())}
+    elif isinstance(in_obj, (list, tuple)):
+        res = [to_fingerprint_data(_) for _ in in_obj]
+    elif inspect.isfunction(in_obj) or inspect.isclass(in_obj):
+        res = f'{in_obj.__module__}.{in_obj.__qualname__}'
+    else:
+        res = _describe_object(in_obj)
+    return res
+
+
+def get_code_version():
+    """returns the hash of the sources of the modules used in optimisation"""
+    res = hashlib.sha256()
+    for _ in _CODE_MODULE_NAMES:
+        res.update(
+            pathlib.Path(importlib.import_module(_).__file__).read_bytes())
+    return res.hexdigest()
+
+
+class ResultStore:
+    """
+    stores the optimisation data in Trajectory files
+    together with a json manifest describing the stored problems,
+    the data is keyed by the hash of the generator function, its arguments
+    and the sources of the modules used in the optimisation
+    """
+    def __init__(self, in_dir_path=None):
+        if in_dir_path is None:
+            in_dir_path = \
+                pc.get_config_parameter('tmpDataFolder')/'optimisation_results'
+        self._dir_path = pathlib.Path(in_dir_path)
+        self._dir_path.mkdir(parents=True, exist_ok=True)
+
+    def _get_manifest_path(self):
+        return self._dir_path/'manifest.json'
+
+    def _get_data_path(self, in_key):
+        return self._dir_path/f'{in_key}.traj'
+
+    def _read_manifest(self):
+        if not self._get_manifest_path().exists():
+            return {}
+        with open(self._get_manifest_path(), encoding='utf-8') as manifest:
+            return json.load(manifest)
+
+    @staticmethod
+    def get_description(in_generator_fun, *args, **kwargs):
+        """returns the json-serialisable description of the problem"""
+        return {
+            'generator': to_fingerprint_data(in_generator_fun),
+            'args': to_fingerprint_data(args),
+            'kwargs': to_fingerprint_data(kwargs),
+            'code_version': get_code_version()}
+
+    @staticmethod
+    def get_key(in_description):
+        """returns the key of the problem with given description"""
+        return hashlib.sha256(
+            json.dumps(in_description, sort_keys=True).encode('utf-8')
+            ).hexdigest()
+
+    def __contains__(self, in_key):
+        return self._get_data_path(in_key).exists()
+
+    def load(self, in_key):
+        """returns the lazily read Trajectory of given key"""
+        return ot.Trajectory(self._get_data_path(in_key))
+
+    def save(self, in_key, in_description, in_opt_data):
+        """stores in_opt_data and updates the manifest"""
+        tmp_path = self._get_data_path(f'{in_key}.tmp')
+        tmp_path.unlink(missing_ok=True)
+        trajectory = ot.Trajectory(tmp_path)
+        for _ in in_opt_data:
+            trajectory.append(_)
+        os.replace(tmp_path, self._get_data_path(in_key))
+        manifest_data = self._read_manifest()
+        manifest_data[in_key] = {
+            'description': in_description, 'creation_time': time.time()}
+        with open(self._get_manifest_path(), 'w', encoding='utf-8') \
+                as manifest:
+            json.dump(manifest_data, manifest, indent=1)
+
+    def generate(self, in_generator_fun, *args, **kwargs):
+        """
+        returns the stored result of in_generator_fun(*args, **kwargs)
+        or generates and stores it if the problem was not solved yet
+        """
+        description = self.get_description(in_generator_fun, *args, **kwargs)
+        key = self.get_key(description)
+        if key in self:
+            return self.load(key)
+        res = in_generator_fun(*args, **kwargs)
+        self.save(key, description, res)
+        return res
@@ -0,0 +1,138 @@
+"""
+contains the definition of the class Trajectory
+storing the rows of the optimisation data in a memory mapped file
+"""
+import collections.abc
+import pathlib
+import numpy
+
+import evaluators as ev
+import optimisation_data_generators as odg
+
+_ROW_FIELD_NUM = 3
+_RESULT_FIELD_NUM = len(ev.EvaluationResult._fields)-1
+_MIN_CAPACITY = 16
+
+
+def _get_column_num(in_data_size, in_shape_num):
+    res = _ROW_FIELD_NUM+in_data_size
+    if in_shape_num >= 0:
+        res += in_shape_num+_RESULT_FIELD_NUM
+    return res
+
+
+def _read_header(in_path):
+    row_num, data_size, shape_num = numpy.fromfile(
+        in_path, dtype=float, count=_ROW_FIELD_NUM).astype(int)
+    return row_num, data_size, shape_num
+
+
+class Trajectory(collections.abc.Sequence):
+    """
+    sequence of the rows of the optimisation data stored in a growable
+    memory mapped file, the rows are read lazily,
+    the first row of the file contains the number of the rows,
+    the size of the data and the number of the shapes of the results
+    (-1 for rows without results)
+    """
+    def __init__(self, in_path):
+        self._path = pathlib.Path(in_path)
+        self._array = None
+        if self._path.exists():
+            _, data_size, shape_num = _read_header(self._path)
+            self._open(
+                data_size, shape_num,
+                self._path.stat().st_size //
+                (_get_column_num(data_size, shape_num)*8)-1)
+
+    @property
+    def path(self):
+        """returns the path of the file"""
+        return self._path
+
+    def _open(self, in_data_size, in_shape_num, in_capacity):
+        column_num = _get_column_num(in_data_size, in_shape_num)
+        mode = 'r+' if self._path.exists() else 'w+'
+        if mode == 'r+' and \
+                self._path.stat().st_size < (in_capacity+1)*column_num*8:
+            with open(self._path, 'r+b') as data_file:
+                data_file.truncate((in_capacity+1)*column_num*8)
+        self._array = numpy.memmap(
+            self._path, dtype=float, mode=mode,
+            shape=(in_capacity+1, column_num))
+        self._array[0, 1:_ROW_FIELD_NUM] = (in_data_size, in_shape_num)
+
+    def _get_data_size(self):
+        return int(self._array[0, 1])
+
+    def _get_shape_num(self):
+        return int(self._array[0, 2])
+
+    def __len__(self):
+        return 0 if self._array is None else int(self._array[0, 0])
+
+    def _row_to_opt_row(self, in_row):
+        data_end = _ROW_FIELD_NUM+self._get_data_size()
+        result = None
+        if self._get_shape_num() >= 0:
+            len_end = data_end+self._get_shape_num()
+            result_sum, result_max, argmax, softmax = in_row[len_end:]
+            result = ev.EvaluationResult(
+                numpy.array(in_row[data_end:len_end]),
+                result_sum.item(), result_max.item(),
+                int(argmax), softmax.item())
+        value = in_row[1].item()
+        eval_count = int(in_row[2])
+        return odg.RowType(
+            numpy.array(in_row[_ROW_FIELD_NUM:data_end]),
+            in_row[0].item(),
+            None if numpy.isnan(value) else value,
+            result,
+            None if eval_count < 0 else eval_count)
+
+    def __getitem__(self, in_index):
+        if isinstance(in_index, slice):
+            return [self[_] for _ in range(*in_index.indices(len(self)))]
+        if in_index < 0:
+            in_index += len(self)
+        if not 0 <= in_index < len(self):
+            raise IndexError('trajectory index out of range')
+        return self._row_to_opt_row(self._array[in_index+1])
+
+    def append(self, in_row):
+        """writes in_row at the end of the file"""
+        data = numpy.asarray(in_row.data, dtype=float).ravel()
+        if self._array is None:
+            self._open(
+                len(data),
+                -1 if in_row.result is None else len(in_row.result.len_array),
+                _MIN_CAPACITY)
+        row_num = len(self)
+        if row_num+1 == len(self._array):
+            self._array.flush()
+            self._open(
+                self._get_data_size(), self._get_shape_num(), 2*row_num)
+        cur_row = self._array[row_num+1]
+        cur_row[:_ROW_FIELD_NUM] = (
+            in_row.time,
+            numpy.nan if in_row.value is None else in_row.value,
+            -1 if in_row.eval_count is None else in_row.eval_count)
+        cur_row[_ROW_FIELD_NUM:_ROW_FIELD_NUM+len(data)] = data
+        if in_row.result is not None:
+            cur_row[_ROW_FIELD_NUM+len(data):] = numpy.concatenate(
+                [in_row.result.len_array, in_row.result[1:]])
+        self._array[0, 0] = row_num+1
+        self._array.flush()
+
+    def truncate(self, in_row_num):
+        """discards the rows after the first in_row_num ones"""
+        if self._array is not None and in_row_num < len(self):
+            self._array[0, 0] = in_row_num
+            self._array.flush()
+
+    def __getstate__(self):
+        return {'path': self._path, 'row_num': len(self)}
+
+    def __setstate__(self, in_state):
+        self.__init__(in_state['path'])
+        self.truncate(in_state['row_num'])
@@ -0,0 +1,286 @@
+"""
+contains the definitions of the classes representing families of shapes:
+ShapeFamily (rotated and shifted copies of a convex shape),
+HalfplaneFamily and StripFamily
+"""
+import collections
+import numpy
+
+import convex_shapes
+import escape_curve
+import extendable_curve
+import rotations
+
+PruningData = collections.namedtuple(
+    'PruningData', ['lower_bounds', 'upper_bounds', 'get_exact_lens'])
+
+# the default limit of the lengths inside the unbounded members,
+# keeps the lengths of the curves never leaving them finite
+DEFAULT_LEN_LIMIT = 100.0
+
+
+class ShapeFamily:
+    """
+    represents the family of the shapes
+    {rotate_2d(x, angles[k])+shifts[k]: x in base_shape}
+    """
+    def __init__(self, in_base_shape, in_angles, in_shifts=(0.0, 0.0)):
+        self._base_shape = in_base_shape
+        self._angles = numpy.array(in_angles, dtype=float).reshape(-1)
+        self._shifts = numpy.zeros((len(self._angles), 2))
+        self._shifts[:] = in_shifts
+        self._rotation_matrices = numpy.moveaxis(
+            rotations.calculate_rotation_matrix_2d(self._angles), -1, 0)
+
+    def __len__(self):
+        return len(self._angles)
+
+    @property
+    def base_shape(self):
+        """returns the base shape"""
+        return self._base_shape
+
+    @property
+    def angles(self):
+        """returns the rotation angles of the members"""
+        return self._angles
+
+    @property
+    def shifts(self):
+        """returns the Kx2 array of the shifts of the members"""
+        return self._shifts
+
+    def to_member_frames(self, in_points, in_member_nums=slice(None)):
+        """
+        returns the ...xKxNx2 array of the points of the ...xNx2 array
+        in_points expressed in the frame of each of the K members
+        (or the members selected by in_member_nums)
+        """
+        points = numpy.asarray(in_points, dtype=float)
+        # row vectors multiplied from the right by R are rotated by R^T
+        return (points[..., numpy.newaxis, :, :] -
+                self._shifts[in_member_nums, numpy.newaxis, :]) @ \
+            self._rotation_matrices[in_member_nums]
+
+    def contains_many(self, in_points):
+        """
+        returns the ...xKxN boolean mask of the points of the ...xNx2 array
+        in_points inside each of the K members
+        """
+        return escape_curve.get_inside_mask(
+            self._base_shape, self.to_member_frames(in_points))
+
+    def get_max_len_inside_array(self, in_point_array, iter_limit=10):
+        """
+        returns the ...xK array of the lengths of the (extended) curve(s)
+        given by the ...xNx2 array in_point_array inside each of the members
+        """
+        local_points = self.to_member_frames(in_point_array)
+        return escape_curve.get_max_len_inside_batch(
+            local_points.reshape((-1,)+local_points.shape[-2:]),
+            self._base_shape, iter_limit).reshape(local_points.shape[:-2])
+
+    def get_max_len_inside_and_grad(self, in_point_array, in_member_num):
+        """
+        returns the length of the (extended) curve given by the Nx2 array
+        in_point_array inside the member in_member_num
+        and its gradient with respect to the points
+        """
+        res_len, local_grad = escape_curve.get_max_len_inside_and_grad(
+            self.to_member_frames(in_point_array, [in_member_num])[0],
+            self._base_shape)
+        return res_len, local_grad @ self._rotation_matrices[in_member_num].T
+
+    def get_pruning_data(self, in_point_array):
+        """
+        returns the PruningData of the curve given by the Nx2 array
+        in_point_array: the bounds of its lengths inside the members
+        (cf. escape_curve.get_len_inside_bounds_batch) and the function
+        get_exact_lens(member_nums, iter_limit) returning its lengths
+        inside the selected members, the points in the frames
+        of the members and their mask inside are computed once
+        """
+        local_points = self.to_member_frames(in_point_array)
+        inside_mask = escape_curve.get_inside_mask(
+            self._base_shape, local_points)
+
+        def get_exact_lens(in_member_nums, in_iter_limit):
+            return escape_curve.get_max_len_inside_batch(
+                local_points[in_member_nums], self._base_shape,
+                in_iter_limit, inside_mask[in_member_nums])
+        return PruningData(
+            *escape_curve.get_len_inside_bounds_batch(
+                local_points, self._base_shape, inside_mask),
+            get_exact_lens)
+
+
+def _get_normals(in_angles):
+    angles = numpy.array(in_angles, dtype=float).reshape(-1)
+    return numpy.stack((numpy.cos(angles), numpy.sin(angles)), axis=1)
+
+
+def _take_at_vertex(in_array, in_vertex_nums):
+    return numpy.take_along_axis(
+        numpy.broadcast_to(
+            in_array, in_array.shape[:-2]+in_vertex_nums.shape[-2:]),
+        in_vertex_nums[..., numpy.newaxis, :, :], axis=-3)[..., 0, :, :]
+
+
+def _get_slab_outside_mask(in_point_array, in_normals, in_lower, in_upper):
+    projections = (in_point_array @ in_normals.T)[..., numpy.newaxis]
+    return (projections > in_upper) | (projections < in_lower)
+
+
+def _get_slab_len_array(in_point_array, in_normals, in_lower, in_upper):
+    """
+    returns the ...xAxS array of the lengths of the (extended) curves
+    given by the ...xNx2 array in_point_array inside the slabs
+    {x: in_lower[a, s] <= x.in_normals[a] <= in_upper[a, s]}
+    """
+    point_array = numpy.asarray(in_point_array, dtype=float)
+    projections = (point_array @ in_normals.T)[..., numpy.newaxis]
+    outside_mask = (projections > in_upper) | (projections < in_lower)
+    assert not outside_mask[..., 0, :, :].any()
+    last_inside = numpy.where(
+        outside_mask.any(axis=-3),
+        numpy.argmax(outside_mask, axis=-3)-1,
+        point_array.shape[-2]-1)
+
+    directions = numpy.concatenate(
+        (numpy.diff(point_array, axis=-2),
+         extendable_curve.get_last_directions(point_array)[
+             ..., numpy.newaxis, :]),
+        axis=-2)
+    dir_projections = _take_at_vertex(
+        (directions @ in_normals.T)[..., numpy.newaxis], last_inside)
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        exit_params = numpy.where(
+            dir_projections == 0,
+            numpy.inf,
+            (numpy.where(dir_projections > 0, in_upper, in_lower) -
+             _take_at_vertex(projections, last_inside))/dir_projections)
+    return _take_at_vertex(
+        escape_curve.calculate_dist_array(point_array)[
+            ..., numpy.newaxis, numpy.newaxis], last_inside) + \
+        exit_params*_take_at_vertex(
+            numpy.linalg.norm(directions, axis=-1)[
+                ..., numpy.newaxis, numpy.newaxis], last_inside)
+
+
+def _get_limited_len_and_grad(in_point_array, in_slab, in_len_limit):
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        res_len, res_grad = escape_curve.get_max_len_inside_and_grad(
+            in_point_array, in_slab)
+    if res_len >= in_len_limit:
+        return in_len_limit, numpy.zeros_like(res_grad)
+    return res_len, res_grad
+
+
+class HalfplaneFamily:
+    """
+    represents the family of the half-planes
+    {x: x.(cos(angles[k]), sin(angles[k])) <= offset},
+    the lengths inside are evaluated exactly using projections
+    onto the normals and are limited by len_limit
+    """
+    def __init__(
+            self, in_angles, in_offset=1.0, in_len_limit=DEFAULT_LEN_LIMIT):
+        assert in_offset > 0
+        self._normals = _get_normals(in_angles)
+        self._offset = in_offset
+        self._len_limit = in_len_limit
+
+    def __len__(self):
+        return len(self._normals)
+
+    def contains_many(self, in_points):
+        """
+        returns the ...xKxN boolean mask of the points of the ...xNx2 array
+        in_points inside each of the K members
+        """
+        return numpy.swapaxes(~_get_slab_outside_mask(
+            numpy.asarray(in_points, dtype=float), self._normals,
+            -numpy.inf, self._offset)[..., 0], -1, -2)
+
+    def get_max_len_inside_array(self, in_point_array, _iter_limit=None):
+        """
+        returns the ...xK array of the lengths of the (extended) curve(s)
+        given by the ...xNx2 array in_point_array inside each of the members
+        """
+        return numpy.minimum(
+            _get_slab_len_array(
+                in_point_array, self._normals,
+                -numpy.inf, self._offset)[..., 0],
+            self._len_limit)
+
+    def get_max_len_inside_and_grad(self, in_point_array, in_member_num):
+        """
+        returns the length of the (extended) curve given by the Nx2 array
+        in_point_array inside the member in_member_num
+        and its gradient with respect to the points
+        """
+        return _get_limited_len_and_grad(
+            in_point_array,
+            convex_shapes.Slab(
+                self._normals[in_member_num], -numpy.inf, self._offset),
+            self._len_limit)
+
+
+class StripFamily:
+    """
+    represents the family of the strips
+    {x: |x.(cos(angles[a]), sin(angles[a]))-shifts[s]| <= width/2},
+    the members are ordered by angles and then by shifts,
+    the lengths inside are evaluated exactly using projections
+    onto the normals and are limited by len_limit
+    """
+    def __init__(
+            self, in_angles, in_shifts, in_width=1.0,
+            in_len_limit=DEFAULT_LEN_LIMIT):
+        shifts = numpy.array(in_shifts, dtype=float).reshape(-1)
+        assert (numpy.abs(shifts) < in_width/2).all()
+        self._normals = _get_normals(in_angles)
+        self._lower = shifts-in_width/2
+        self._upper = shifts+in_width/2
+        self._len_limit = in_len_limit
+
+    def __len__(self):
+        return len(self._normals)*len(self._lower)
+
+    def _to_member_array(self, in_array):
+        return in_array.reshape(in_array.shape[:-2]+(len(self),))
+
+    def contains_many(self, in_points):
+        """
+        returns the ...xKxN boolean mask of the points of the ...xNx2 array
+        in_points inside each of the K members
+        """
+        outside_mask = _get_slab_outside_mask(
+            numpy.asarray(in_points, dtype=float), self._normals,
+            self._lower, self._upper)
+        return numpy.swapaxes(
+            ~self._to_member_array(outside_mask), -1, -2)
+
+    def get_max_len_inside_array(self, in_point_array, _iter_limit=None):
+        """
+        returns the ...xK array of the lengths of the (extended) curve(s)
+        given by the ...xNx2 array in_point_array inside each of the members
+        """
+        return numpy.minimum(
+            self._to_member_array(_get_slab_len_array(
+                in_point_array, self._normals, self._lower, self._upper)),
+            self._len_limit)
+
+    def get_max_len_inside_and_grad(self, in_point_array, in_member_num):
+        """
+        returns the length of the (extended) curve given by the Nx2 array
+        in_point_array inside the member in_member_num
+        and its gradient with respect to the points
+        """
+        angle_num, shift_num = divmod(in_member_num, len(self._lower))
+        return _get_limited_len_and_grad(
+            in_point_array,
+            convex_shapes.Slab(
+                self._normals[angle_num],
+                self._lower[shift_num], self._upper[shift_num]),
+            self._len_limit)
@@ -0,0 +1,74 @@
+"""tests for the module adaptive_shape_sampling"""
+import numpy
+import pytest
+
+import adaptive_shape_sampling as ass
+import curve_representations as cr
+import convex_shapes
+import optimisation_data_generators as odg
+
+_STRIP_BOUNDS = [(0, numpy.pi), (0, 0), (-0.49, 0.49)]
+
+
+def _get_strip_motion_family():
+    return ass.MotionFamily(
+        convex_shapes.Rectangle((0, 0), 8, 1), _STRIP_BOUNDS)
+
+
+def test_get_grid_parameters():
+    """the grid points are the centres of the cells"""
+    res = ass.get_grid_parameters(_STRIP_BOUNDS, (4, 1, 2))
+    assert res.shape == (8, 3)
+    assert numpy.allclose(numpy.unique(res[:, 0]), numpy.pi*numpy.array(
+        [0.125, 0.375, 0.625, 0.875]))
+    assert (res[:, 1] == 0).all()
+    assert numpy.allclose(numpy.unique(res[:, 2]), [-0.245, 0.245])
+
+
+@pytest.mark.parametrize('in_seed', [1, 2, 3])
+def test_find_worst_parameters(in_seed):
+    """the local maximisation beats the dense grid"""
+    point_array = cr.AzimuthRepresentation(20, 2.5).to_curves_batch(
+        [numpy.random.default_rng(in_seed).uniform(-1, 1, 20)])[0]
+    worst_parameters, worst_len = ass.find_worst_parameters(
+        _get_strip_motion_family(), point_array,
+        ass.get_grid_parameters(_STRIP_BOUNDS, (5, 1, 4)))
+    bounds = numpy.array(_STRIP_BOUNDS)
+    assert (bounds[:, 0] <= worst_parameters).all()
+    assert (worst_parameters <= bounds[:, 1]).all()
+    base_shape = _get_strip_motion_family().base_shape
+    assert worst_len == pytest.approx(ass.get_len_inside_array(
+        base_shape, point_array, worst_parameters)[0])
+    assert worst_len >= ass.get_len_inside_array(
+        base_shape, point_array,
+        ass.get_grid_parameters(_STRIP_BOUNDS, (40, 1, 40))).max()
+
+
+def test_generate_active_set_data():
+    """the active set grows with the members longer than its maximum"""
+    representation = cr.AzimuthRepresentation(6, 2.5)
+    x0_list = []
+
+    def run_round(in_shape_family, in_x0, _in_round_num):
+        x0_list.append(in_x0)
+        step_args = {'maxiter': 2}
+        if in_x0 is not None:
+            step_args['x0'] = in_x0
+        return odg.generate_multiple_shape_optimisation_data(
+            representation, in_shape_family, 5,
+            step_args, {'maxiter': 2}, seed=1)
+
+    round_list = ass.generate_active_set_data(
+        run_round, representation, _get_strip_motion_family(),
+        ass.get_grid_parameters(_STRIP_BOUNDS, (3, 1, 2)), 4)
+    assert x0_list[0] is None
+    family_sizes = [len(_.shape_family) for _ in round_list]
+    assert family_sizes[0] == 6
+    assert family_sizes == sorted(set(family_sizes))
+    for cur_round in round_list:
+        assert cur_round.worst_len >= cur_round.opt_data[-1].result.max
+    times = [_.time for cur_round in round_list for _ in cur_round.opt_data]
+    assert times == sorted(times)
+    assert len(round_list) > 1
+    assert ass.get_best_round(round_list).worst_len == \
+        min(_.worst_len for _ in round_list)
@@ -38,3 +38,77 @@ def test_contains(in_data):
 def test_does_not_contain(in_data):
     """negative test for the method __contains__"""
     assert in_data.point not in in_data.shape
+
+
+@pytest.mark.parametrize(
+    "example_shape",
+    [cs.Wheel([0, 0], 1), cs.Wheel([4, 3], 2),
+     cs.Rectangle([0, 0], 2, 4), cs.Rectangle([1, 1], 2, 4)])
+def test_contains_many(example_shape):
+    """contains_many agrees with __contains__"""
+    points = numpy.random.default_rng(3).uniform(-3, 6, (5, 40, 2))
+    mask = example_shape.contains_many(points)
+    assert mask.shape == points.shape[:-1]
+    for (cur_point, cur_val) in zip(points.reshape(-1, 2), mask.flatten()):
+        assert (cur_point in example_shape) == cur_val
+
+
+ExitExample = collections.namedtuple(
+    "ExitExample", ["shape", "pos", "direction", "exit_parameter"])
+
+
+@pytest.mark.parametrize(
+    "in_data",
+    [
+        ExitExample(cs.Wheel([0, 0], 1), [0, 0], [1, 0], 1),
+        ExitExample(cs.Wheel([0, 0], 1), [0, 0], [0, -2], 0.5),
+        ExitExample(cs.Wheel([0, 0], 2), [0, 1], [0, 1], 1),
+        ExitExample(cs.Wheel([1, 1], 1), [1, 1], [3, 4], 0.2),
+        ExitExample(cs.Rectangle([0, 0], 2, 4), [0, 0], [1, 0], 1),
+        ExitExample(cs.Rectangle([0, 0], 2, 4), [0, 0], [0, -1], 2),
+        ExitExample(cs.Rectangle([0, 0], 2, 4), [0.5, 0], [1, 1], 0.5),
+        ExitExample(cs.Rectangle([1, 1], 2, 4), [1, 1], [-2, 8], 0.25),
+    ],
+)
+def test_find_exit_parameter(in_data):
+    """test of the method find_exit_parameter"""
+    assert numpy.isclose(
+        in_data.shape.find_exit_parameter(
+            numpy.array(in_data.pos), numpy.array(in_data.direction)),
+        in_data.exit_parameter)
+
+
+def test_slab():
+    """test of the class Slab"""
+    slab = cs.Slab([0.6, 0.8], -0.5, 1)
+    points = numpy.random.default_rng(4).uniform(-3, 3, (50, 2))
+    for (cur_point, cur_val) in zip(points, slab.contains_many(points)):
+        assert (cur_point in slab) == cur_val
+    assert numpy.isclose(slab.find_exit_parameter([0, 0], [0, 2]), 0.625)
+    assert numpy.isclose(slab.find_exit_parameter([0, 0], [-3, 0]), 0.5/1.8)
+    assert cs.Slab([1, 0], -1, 1).find_exit_parameter([0, 0], [0, 1]) == \
+        numpy.inf
+
+
+NormalExample = collections.namedtuple(
+    "NormalExample", ["shape", "pos", "direction", "normal"])
+
+
+@pytest.mark.parametrize(
+    "in_data",
+    [
+        NormalExample(cs.Wheel([1, 1], 1), [1, 1], [3, 4], [0.6, 0.8]),
+        NormalExample(cs.Rectangle([0, 0], 2, 4), [0.5, 0], [1, 1], [1, 0]),
+        NormalExample(cs.Rectangle([1, 1], 2, 4), [1, 1], [-2, 8], [0, 1]),
+        NormalExample(
+            cs.Slab([0.6, 0.8], -0.5, 1), [0, 0], [0, -1], [-0.6, -0.8]),
+        NormalExample(cs.Slab([1, 0], -numpy.inf, 1), [0, 0], [1, 1], [1, 0]),
+    ],
+)
+def test_get_outward_normals(in_data):
+    """the normals at the exit points are outward and perpendicular"""
+    exit_point = numpy.array(in_data.pos) + numpy.array(in_data.direction) * \
+        in_data.shape.find_exit_parameter(
+            numpy.array(in_data.pos), numpy.array(in_data.direction))
+    normal = in_data.shape.get_outward_normals(exit_point)
+    assert numpy.allclose(normal/numpy.linalg.norm(normal), in_data.normal)
@@ -66,3 +66,26 @@ def test_logo_agnles_to_azimuth_angles(in_logo_angles):
             curve.logo_agnles_to_azimuth_angles(in_logo_angles), segment_size)
     for _ in zip(logo_curve.point_list, azimuth_curve.point_list):
         numpy.allclose(*_)
+
+
+@pytest.mark.parametrize(
+    'example_curve',
+    [
+        curve.LogoCurve([0.1, 0.2, -0.3], 0.5),
+        curve.AzimuthCurve([0.1, 0.2, -0.3], 0.5),
+        curve.PointCurve([numpy.array([1, 2]), numpy.array([3, 4])]),
+        curve.ShiftCurve([numpy.array([1, 2]), numpy.array([3, 4])])])
+def test_coordinate_lists_are_views(example_curve):
+    """x_list and y_list share the memory with point_list"""
+    assert example_curve.point_list.shape == \
+        (len(example_curve.x_list), 2)
+    assert numpy.shares_memory(example_curve.x_list, example_curve.point_list)
+    assert numpy.shares_memory(example_curve.y_list, example_curve.point_list)
+
+
+def test_shift_curve_points():
+    """test of the points of a ShiftCurve"""
+    assert numpy.allclose(
+        curve.ShiftCurve(
+            [numpy.array([1, 2]), numpy.array([3, 4])]).point_list,
+        [[0, 0], [1, 2], [4, 6]])
@@ -0,0 +1,75 @@
+"""tests for the module curve_representations"""
+import numpy
+import pytest
+
+import curve_representations as cr
+
+
+def _get_example_representations():
+    return [
+        cr.LogoRepresentation(6, 2.5),
+        cr.AzimuthRepresentation(6, 2.5),
+        cr.LogoRepresentationFix(6, 2.5),
+        cr.AzimuthRepresentationFix(6, 2.5),
+        cr.PointCurveRepresentation(12, -1, 1),
+        cr.ShiftCurveRepresentation(12, -1, 1)]
+
+
+def _get_random_data_matrix(in_representation, in_row_num, in_seed):
+    bounds = numpy.array(in_representation.bounds)
+    return numpy.random.default_rng(in_seed).uniform(
+        bounds[:, 0], bounds[:, 1], (in_row_num, len(bounds)))
+
+
+@pytest.mark.parametrize(
+    "example_representation", _get_example_representations())
+@pytest.mark.parametrize("row_num", [1, 7])
+def test_to_curves_batch(example_representation, row_num):
+    """to_curves_batch agrees with to_curve applied row by row"""
+    data_matrix = _get_random_data_matrix(
+        example_representation, row_num, row_num)
+    batch_res = example_representation.to_curves_batch(data_matrix)
+    assert batch_res.shape[0] == row_num
+    for (cur_data, cur_points) in zip(data_matrix, batch_res):
+        assert numpy.allclose(
+            example_representation.to_curve(cur_data).point_list,
+            cur_points)
+
+
+@pytest.mark.parametrize(
+    "example_representation", _get_example_representations())
+def test_get_data_gradient(example_representation):
+    """the gradient of a linear function of the points"""
+    cur_data = _get_random_data_matrix(example_representation, 1, 3)[0]
+    weights = numpy.random.default_rng(4).normal(
+        size=example_representation.to_curves_batch([cur_data])[0].shape)
+
+    def example_fun(in_data):
+        return numpy.sum(
+            weights*example_representation.to_curves_batch([in_data])[0])
+    step = 1e-6
+    numerical_gradient = [
+        (example_fun(cur_data+_)-example_fun(cur_data-_))/(2*step)
+        for _ in step*numpy.eye(len(cur_data))]
+    assert numpy.allclose(
+        example_representation.get_data_gradient(cur_data, weights),
+        numerical_gradient)
+
+
+@pytest.mark.parametrize(
+    "example_representation", _get_example_representations())
+def test_get_first_changed_point(example_representation):
+    """the points before the first changed point stay in place"""
+    base_data, changed_data = _get_random_data_matrix(
+        example_representation, 2, 5)
+    for data_num in range(len(base_data)):
+        cur_data = numpy.concatenate(
+            (base_data[:data_num], changed_data[data_num:]))
+        first_changed = example_representation.get_first_changed_point(
+            data_num)
+        base_points, cur_points = example_representation.to_curves_batch(
+            [base_data, cur_data])
+        assert numpy.array_equal(
+            base_points[:first_changed], cur_points[:first_changed])
+        assert not numpy.allclose(
+            base_points[first_changed], cur_points[first_changed])
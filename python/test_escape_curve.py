@@ -5,6 +5,7 @@ import pytest
 
 import escape_curve
 import convex_shapes
+import testing_shapes as ts
 
 
 def _get_example_curves():
@@ -45,3 +46,120 @@ def test_calculate_dist_list():
         numpy.array([2, 10])]
     dist_list = [0, 1, 2, 3, 12]
     assert escape_curve.calculate_dist_list(point_list) == dist_list
+
+
+@pytest.mark.parametrize(
+    "example_shape",
+    [convex_shapes.Wheel([0.1, 0.2], 1.3),
+     convex_shapes.Rectangle([0.1, 0.2], 1.3, 0.7)])
+@pytest.mark.parametrize(
+    "pos_out", [numpy.array(_) for _ in [[2, 0], [-1, -3], [0.3, 4]]])
+def test_find_distance_to_boundary_exact(example_shape, pos_out):
+    """
+    the exact distance to the boundary agrees with the bisection
+    """
+    pos_in = numpy.array([0.0, 0.0])
+    exact_res = escape_curve.find_distance_to_boundary(
+        pos_in, pos_out, example_shape, 0)
+    bisection_res = escape_curve.find_distance_to_boundary(
+        pos_in, pos_out, ts.ShapeWithoutProtocols(example_shape), 40)
+    assert abs(exact_res-bisection_res) < 0.00001
+
+
+@pytest.mark.parametrize("example_curve", _get_example_curves())
+def test_ray_extension_without_exit_parameter(example_curve):
+    """
+    test the method get_max_len_inside for a shape not providing
+    find_exit_parameter and requiring long extension of the curve
+    """
+    radius = 40
+    point_num = len(example_curve.point_list)
+    assert abs(
+        example_curve.get_max_len_inside(
+            ts.WheelWithoutProtocols([0, 0], radius), 40) -
+        radius) < 0.00001
+    assert len(example_curve.point_list) == point_num
+
+
+def test_extended_points():
+    """the points of the extension continue the last segment"""
+    example_curve = escape_curve.ShiftCurve([numpy.array([1.0, 2.0])])
+    assert numpy.allclose(example_curve[1], [1, 2])
+    assert numpy.allclose(example_curve[4], [4, 8])
+    assert len(example_curve.point_list) == 2
+
+
+def _get_numerical_gradient(in_fun, in_array, in_step=1e-6):
+    res = numpy.zeros_like(in_array)
+    for ind in numpy.ndindex(in_array.shape):
+        shift = numpy.zeros_like(in_array)
+        shift[ind] = in_step
+        res[ind] = (in_fun(in_array+shift)-in_fun(in_array-shift))/(2*in_step)
+    return res
+
+
+@pytest.mark.parametrize(
+    "example_shape",
+    [convex_shapes.Wheel(numpy.array([0.1, 0.2]), 1),
+     convex_shapes.Rectangle(numpy.array([0.1, -0.2]), 2, 1.5),
+     convex_shapes.Slab([0.6, 0.8], -0.7, 0.9)])
+@pytest.mark.parametrize("scale", [0.1, 0.5])
+def test_get_max_len_inside_and_grad(example_shape, scale):
+    """the gradient agrees with the finite differences"""
+    point_array = numpy.concatenate(
+        (numpy.zeros((1, 2)),
+         numpy.random.default_rng(7).normal(scale=scale, size=(5, 2))))
+    res_len, res_grad = escape_curve.get_max_len_inside_and_grad(
+        point_array, example_shape)
+    assert numpy.isclose(
+        res_len,
+        escape_curve.get_max_len_inside_batch(
+            point_array[numpy.newaxis], example_shape)[0])
+    assert numpy.allclose(
+        res_grad,
+        _get_numerical_gradient(
+            lambda x: escape_curve.get_max_len_inside_and_grad(
+                x, example_shape)[0],
+            point_array),
+        atol=1e-5)
+
+
+@pytest.mark.parametrize("first_changed", [1, 3, 6, 9])
+def test_update_escape_state(first_changed):
+    """the updated state agrees with the state evaluated from scratch"""
+    set_list = [
+        convex_shapes.Wheel(numpy.array([0.1, 0.2]), 1),
+        convex_shapes.Rectangle(numpy.array([0.1, -0.2]), 2, 1.5),
+        ts.WheelWithoutProtocols(numpy.array([0.0, 0.1]), 0.7)]
+    rng = numpy.random.default_rng(first_changed)
+    base_points = numpy.cumsum(
+        numpy.concatenate(
+            (numpy.zeros((1, 2)), rng.uniform(-0.2, 0.3, (9, 2)))),
+        axis=0)
+    cur_points = base_points.copy()
+    cur_points[first_changed:] += rng.uniform(-0.5, 0.5, (10-first_changed, 2))
+    res = escape_curve.update_escape_state(
+        escape_curve.get_escape_state(base_points, set_list, 20),
+        lambda: cur_points, first_changed, set_list)
+    expected = escape_curve.get_escape_state(cur_points, set_list, 20)
+    assert numpy.array_equal(res.dist_array, expected.dist_array)
+    assert numpy.array_equal(res.first_outside, expected.first_outside)
+    assert numpy.array_equal(res.len_array, expected.len_array)
+    assert numpy.allclose(
+        res.len_array,
+        [escape_curve.PointCurve(list(cur_points[1:])).get_max_len_inside(
+            _, 20) for _ in set_list])
+
+
+def test_update_escape_state_reuse():
+    """the points are not evaluated if the curve leaves all of the sets"""
+    set_list = [convex_shapes.Wheel(numpy.array([0.0, 0.0]), 1)]
+    base_state = escape_curve.get_escape_state(
+        numpy.array([[0.0, 0.0], [0.5, 0.0], [1.5, 0.0], [1.5, 1.0]]),
+        set_list)
+    assert list(base_state.first_outside) == [2]
+
+    def get_point_array():
+        raise AssertionError('the points should not be evaluated')
+    assert escape_curve.update_escape_state(
+        base_state, get_point_array, 3, set_list) is base_state
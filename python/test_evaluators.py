@@ -1,9 +1,13 @@
 """tests for the most cost_functions"""
+import numpy
 import pytest
+import scipy.optimize
 
 import evaluators as ev
 import curve_representations as cr
 import convex_shapes
+import testing_shapes as ts
+import shape_families as sf
 
 
 def _get_example_representations():
@@ -55,3 +59,250 @@ def test_evaluate_data_sum_in_multiple_shape(example_representation):
         example_representation, _get_example_shape_list(), 20)
     cur_data = _get_trivial_data(example_representation)
     assert abs(cur_evaluator.evaluate_data_sum(cur_data)-3) < 0.000001
+
+
+def _get_random_data_matrix(in_representation, in_row_num):
+    bounds = numpy.array(in_representation.bounds)
+    return numpy.random.default_rng(11).uniform(
+        bounds[:, 0], bounds[:, 1], (in_row_num, len(bounds)))
+
+
+def _get_batch_example_representations():
+    return [
+        cr.LogoRepresentation(7, 2.5),
+        cr.AzimuthRepresentationFix(7, 2.5),
+        cr.PointCurveRepresentation(14, -1, 1),
+        cr.ShiftCurveRepresentation(14, -0.3, 0.3)]
+
+
+def _get_batch_example_shape_list():
+    return [
+        convex_shapes.Wheel((0.1, 0, ), 1),
+        convex_shapes.Rectangle((0, 0.2, ), 1, 2),
+        ts.WheelWithoutProtocols((0, 0.1, ), 0.7)]
+
+
+@pytest.mark.parametrize(
+    "example_representation", _get_batch_example_representations())
+@pytest.mark.parametrize("example_shape", _get_batch_example_shape_list())
+def test_evaluate_data_batch(example_representation, example_shape):
+    """evaluate_data_batch agrees with evaluate_data"""
+    cur_evaluator = ev.get_single_shape_evaluator(
+        example_representation, example_shape, 20)
+    data_matrix = _get_random_data_matrix(example_representation, 10)
+    assert numpy.allclose(
+        cur_evaluator.evaluate_data_batch(data_matrix),
+        [cur_evaluator.evaluate_data(_) for _ in data_matrix])
+
+
+@pytest.mark.parametrize(
+    "example_representation", _get_batch_example_representations())
+def test_evaluate_data_batch_max_and_sum(example_representation):
+    """evaluate_data_batch_max/sum agree with evaluate_data_max/sum"""
+    cur_evaluator = ev.get_multiple_shape_evaluator(
+        example_representation, _get_batch_example_shape_list(), 20)
+    data_matrix = _get_random_data_matrix(example_representation, 10)
+    assert numpy.allclose(
+        cur_evaluator.evaluate_data_batch_max(data_matrix),
+        [cur_evaluator.evaluate_data_max(_) for _ in data_matrix])
+    assert numpy.allclose(
+        cur_evaluator.evaluate_data_batch_sum(data_matrix),
+        [cur_evaluator.evaluate_data_sum(_) for _ in data_matrix])
+
+
+def test_halfplane_family_evaluator():
+    """the straight curve leaves all half-planes after the distance 1"""
+    cur_evaluator = ev.get_halfplane_family_evaluator(
+        cr.AzimuthRepresentation(4, 0.5),
+        numpy.linspace(-0.1, 0.1, 3))
+    assert abs(cur_evaluator.evaluate_data_max([0, 0, 0, 0]) -
+               1/numpy.cos(0.1)) < 0.000001
+
+
+def test_halfplane_family_evaluator_len_limit():
+    """the curve never leaving a half-plane has a finite length inside"""
+    cur_evaluator = ev.get_halfplane_family_evaluator(
+        cr.AzimuthRepresentation(4, 0.5), [0.0, numpy.pi/2])
+    assert cur_evaluator.evaluate_data_batch_max([[numpy.pi]*4]) == \
+        pytest.approx([sf.DEFAULT_LEN_LIMIT])
+
+
+def test_strip_family_evaluator():
+    """test of the method evaluate_data_batch_max for strips"""
+    cur_evaluator = ev.get_strip_family_evaluator(
+        cr.AzimuthRepresentation(4, 0.5),
+        [0], [-0.25, 0, 0.25])
+    assert numpy.allclose(
+        cur_evaluator.evaluate_data_batch_max(
+            [[0, 0, 0, 0], [numpy.pi]*4]), [0.75, 0.75])
+
+
+@pytest.mark.parametrize(
+    "example_representation", _get_batch_example_representations())
+def test_evaluate_data_result(example_representation):
+    """the aggregates of evaluate_data_result agree with the evaluators"""
+    cur_evaluator = ev.get_multiple_shape_evaluator(
+        example_representation, _get_batch_example_shape_list(), 20)
+    for cur_data in _get_random_data_matrix(example_representation, 5):
+        cur_res = cur_evaluator.evaluate_data_result(cur_data)
+        assert len(cur_res.len_array) == len(_get_batch_example_shape_list())
+        assert numpy.isclose(
+            cur_res.max, cur_evaluator.evaluate_data_max(cur_data))
+        assert numpy.isclose(
+            cur_res.sum, cur_evaluator.evaluate_data_sum(cur_data))
+        assert cur_res.len_array[cur_res.argmax] == cur_res.max
+        assert cur_res.max <= cur_res.softmax <= \
+            cur_res.max+0.05*numpy.log(len(cur_res.len_array))
+
+
+def _get_strip_like_shape_family():
+    angle_num = 15
+    shift_num = 30
+    return sf.ShapeFamily(
+        convex_shapes.Rectangle((0, 0), 8, 1),
+        numpy.tile(
+            numpy.linspace(0, numpy.pi, angle_num, endpoint=False),
+            shift_num),
+        numpy.stack(
+            (numpy.zeros(angle_num*shift_num),
+             numpy.repeat(numpy.linspace(-0.49, 0.49, shift_num), angle_num)),
+            axis=1))
+
+
+def _get_wheel_family_without_protocols():
+    shift_grid = numpy.linspace(-0.3, 0.3, 6)
+    return sf.ShapeFamily(
+        ts.WheelWithoutProtocols((0, 0), 1.2),
+        numpy.zeros(len(shift_grid)**2),
+        numpy.stack(numpy.meshgrid(shift_grid, shift_grid), axis=-1).reshape(
+            -1, 2))
+
+
+@pytest.mark.parametrize(
+    "example_shapes",
+    [_get_batch_example_shape_list(), _get_wheel_family_without_protocols()])
+def test_evaluate_data_max_pruned(example_shapes):
+    """evaluate_data_max_pruned agrees with evaluate_data_max"""
+    example_representation = cr.AzimuthRepresentation(20, 2.5)
+    cur_evaluator = ev.get_multiple_shape_evaluator(
+        example_representation, example_shapes, 20)
+    data_matrix = _get_random_data_matrix(example_representation, 10)
+    for cur_data in data_matrix:
+        assert numpy.isclose(
+            cur_evaluator.evaluate_data_max_pruned(cur_data),
+            cur_evaluator.evaluate_data_max(cur_data))
+    assert cur_evaluator.get_exact_evaluation_count() < \
+        len(data_matrix)*len(example_shapes)
+
+
+@pytest.mark.parametrize(
+    "example_shapes",
+    [_get_batch_example_shape_list()[:2], _get_strip_like_shape_family()])
+def test_evaluate_data_max_pruned_closed_form(example_shapes):
+    """shapes with closed-form exits are evaluated without pruning"""
+    example_representation = cr.AzimuthRepresentation(20, 2.5)
+    cur_evaluator = ev.get_multiple_shape_evaluator(
+        example_representation, example_shapes, 20)
+    for cur_data in _get_random_data_matrix(example_representation, 5):
+        assert cur_evaluator.evaluate_data_max_pruned(cur_data) == \
+            cur_evaluator.evaluate_data_max(cur_data)
+    assert cur_evaluator.get_exact_evaluation_count() == 0
+
+
+def test_evaluation_cache():
+    """test of the hit/miss counters and the eviction of EvaluationCache"""
+    call_list = []
+
+    def example_fun(in_data):
+        call_list.append(list(in_data))
+        return sum(in_data)
+    cached_fun = ev.EvaluationCache(example_fun, 2)
+    assert cached_fun([1, 2]) == 3
+    assert cached_fun(numpy.array([1.0, 2.0])) == 3
+    assert cached_fun([3, 4]) == 7
+    assert cached_fun([1, 2]) == 3
+    assert cached_fun([5, 6]) == 11
+    assert len(cached_fun) == 2
+    assert (cached_fun.hit_count, cached_fun.miss_count) == (2, 3)
+    assert cached_fun([3, 4]) == 7
+    assert call_list == [[1, 2], [3, 4], [5, 6], [3, 4]]
+    cached_fun.clear()
+    assert len(cached_fun) == 0
+
+
+def test_set_iter_limit():
+    """the iteration limit changes the precision of the evaluations"""
+    example_representation = cr.AzimuthRepresentation(4, 3)
+    example_shape = ts.WheelWithoutProtocols((0, 0), 1)
+    cur_evaluator = ev.get_single_shape_evaluator(
+        example_representation, example_shape, 2)
+    cur_data = _get_random_data_matrix(example_representation, 1)[0]
+    coarse_value = cur_evaluator.evaluate_data(cur_data)
+    cur_evaluator.set_iter_limit(30)
+    assert cur_evaluator.get_iter_limit() == 30
+    fine_value = cur_evaluator.evaluate_data(cur_data)
+    assert fine_value == pytest.approx(
+        ev.get_single_shape_evaluator(
+            example_representation, convex_shapes.Wheel((0, 0), 1), 5
+        ).evaluate_data(cur_data))
+    assert coarse_value != pytest.approx(fine_value)
+
+
+@pytest.mark.parametrize(
+    "example_representation", _get_batch_example_representations())
+def test_evaluate_data_and_grad(example_representation):
+    """the gradients agree with the finite differences of the values"""
+    example_shape_list = _get_batch_example_shape_list()[:2]
+    single_evaluator = ev.get_single_shape_evaluator(
+        example_representation, example_shape_list[0], 40)
+    multiple_evaluator = ev.get_multiple_shape_evaluator(
+        example_representation, example_shape_list, 40)
+    for cur_data in _get_random_data_matrix(example_representation, 5):
+        for (value_fun, value_and_grad_fun) in [
+                (single_evaluator.evaluate_data,
+                 single_evaluator.evaluate_data_and_grad),
+                (multiple_evaluator.evaluate_data_max,
+                 multiple_evaluator.evaluate_data_max_and_grad)]:
+            cur_value, cur_grad = value_and_grad_fun(cur_data)
+            assert cur_value == pytest.approx(value_fun(cur_data))
+            assert numpy.allclose(
+                cur_grad,
+                scipy.optimize.approx_fprime(
+                    cur_data, lambda x, fun=value_and_grad_fun: fun(x)[0],
+                    1e-7),
+                atol=1e-4)
+
+
+def _get_local_moves(in_representation, in_move_num):
+    rng = numpy.random.default_rng(3)
+    bounds = numpy.array(in_representation.bounds)
+    cur_data = rng.uniform(bounds[:, 0], bounds[:, 1])
+    res = [cur_data]
+    for _ in range(in_move_num):
+        cur_data = cur_data.copy()
+        data_num = rng.integers(len(cur_data))
+        cur_data[data_num] = rng.uniform(*bounds[data_num])
+        res.append(cur_data)
+    return res
+
+
+@pytest.mark.parametrize(
+    "example_representation", _get_batch_example_representations())
+def test_evaluate_data_incremental(example_representation):
+    """the incremental evaluations agree with the evaluations from scratch"""
+    single_evaluator = ev.get_single_shape_evaluator(
+        example_representation, _get_batch_example_shape_list()[0], 20)
+    multiple_evaluator = ev.get_multiple_shape_evaluator(
+        example_representation, _get_batch_example_shape_list(), 20)
+    for cur_data in _get_local_moves(example_representation, 30):
+        assert single_evaluator.evaluate_data_incremental(cur_data) == \
+            pytest.approx(single_evaluator.evaluate_data(cur_data))
+        assert numpy.allclose(
+            multiple_evaluator.evaluate_data_result_incremental(
+                cur_data).len_array,
+            multiple_evaluator.evaluate_data_result(cur_data).len_array)
+    multiple_evaluator.set_iter_limit(5)
+    assert numpy.allclose(
+        multiple_evaluator.evaluate_data_result_incremental(
+            cur_data).len_array,
+        multiple_evaluator.evaluate_data_result(cur_data).len_array)
@@ -0,0 +1,32 @@
+"""tests for the module optimisation_animations_utils"""
+import functools
+import numpy
+
+import curve_representations as cr
+import optimisation_animations_utils as oau
+import plotable_convex_shapes as pcs
+
+
+def _render_example_frames(in_dir_path, in_max_workers):
+    in_dir_path.mkdir()
+    frame_specs = [
+        oau.FrameSpec(
+            numpy.full(4, 0.3*_), 0.23+0.1*_, in_dir_path/f'frame_{_}.pdf')
+        for _ in range(20)]
+    oau.render_frames(
+        oau.AnimationSpec(
+            cr.AzimuthRepresentation(4, 0.5), 'blue',
+            functools.partial(
+                pcs.Wheel(numpy.array([0.0, 0.0]), 1.0).plot,
+                facecolor='lightgreen', edgecolor='green'),
+            ((-1.5, 1.5), (-1.5, 1.5))),
+        frame_specs, in_max_workers)
+    return [_.pdf_path.read_bytes() for _ in frame_specs]
+
+
+def test_render_frames(tmp_path, monkeypatch):
+    """the frames rendered in a process pool are the same as the serial ones"""
+    monkeypatch.setenv('SOURCE_DATE_EPOCH', '0')
+    serial_frames = _render_example_frames(tmp_path/'serial', 1)
+    assert all(_.startswith(b'%PDF') for _ in serial_frames)
+    assert _render_example_frames(tmp_path/'pool', 2) == serial_frames
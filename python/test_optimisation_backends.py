@@ -0,0 +1,38 @@
+"""tests for the module optimisation_backends"""
+import numpy
+import pytest
+
+import optimisation_backends as ob
+
+
+def _shifted_sphere(in_data_matrix):
+    return ((in_data_matrix-0.3)**2).sum(axis=1)
+
+
+@pytest.mark.parametrize('in_backend_name', ob.get_backend_names())
+def test_minimise_sphere(in_backend_name):
+    """all of the backends find the minimum of a sphere function"""
+    value_list = []
+    best_x, best_value = ob.get_backend(in_backend_name)(
+        lambda x: _shifted_sphere(numpy.atleast_2d(x))[0],
+        _shifted_sphere,
+        [(-1, 1)]*3,
+        lambda x, value: value_list.append(value),
+        seed=numpy.random.default_rng(1))
+    assert numpy.allclose(best_x, 0.3, atol=1e-4)
+    assert best_value == pytest.approx(0, abs=1e-7)
+    assert value_list == sorted(value_list, reverse=True)
+
+
+def test_differential_evolution_maxfun():
+    """differential evolution evaluates at most maxfun points"""
+    eval_counts = []
+
+    def batch_fun(in_data_matrix):
+        eval_counts.append(len(in_data_matrix))
+        return _shifted_sphere(in_data_matrix)
+
+    ob.minimise_differential_evolution(
+        None, batch_fun, [(-1, 1)]*2, lambda x, value: None,
+        maxfun=100, popsize=5, seed=numpy.random.default_rng(1))
+    assert 0 < sum(eval_counts) <= 100
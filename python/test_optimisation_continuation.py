@@ -0,0 +1,74 @@
+"""tests for the module optimisation_continuation"""
+import numpy
+
+import optimisation_continuation as oc
+import optimisation_data_generators as odg
+import curve_representations as cr
+import convex_shapes
+
+
+def test_upsample_points():
+    """the upsampled curve passes through the original points"""
+    point_array = numpy.array([[0.0, 0.0], [1.0, 0.0], [1.0, 3.0]])
+    res = oc.upsample_points(point_array, 3)
+    assert res.shape == (7, 2)
+    assert numpy.allclose(res[::3], point_array)
+    assert numpy.allclose(res[4], [1.0, 1.0])
+
+
+def test_refined_representation():
+    """the refined data is inside of its bounds and represents the curve"""
+    representation = cr.AzimuthRepresentation(4, 2)
+    data = numpy.array([0.1, 0.5, -0.3, 1.2])
+    refined_representation, refined_data = oc.get_refined_representation(
+        representation, data, 0.2)
+    assert len(refined_data) == 2*2*len(data)
+    bounds = numpy.array(refined_representation.bounds)
+    assert numpy.allclose(bounds[:, 0], refined_data-0.2)
+    assert numpy.allclose(bounds[:, 1], refined_data+0.2)
+    assert numpy.allclose(
+        refined_representation.to_curves_batch([refined_data])[0][::2],
+        representation.to_curves_batch([data])[0])
+
+
+def test_generate_continuation_data():
+    """every level doubles the data size and continues the time"""
+    shape_list = [
+        convex_shapes.Wheel((0, 0), 1), convex_shapes.Wheel((0.1, 0), 1)]
+    x0_list = []
+
+    def run_level(in_representation, in_x0, _in_level_num):
+        x0_list.append(in_x0)
+        step_args = {'maxiter': 2}
+        if in_x0 is not None:
+            step_args['x0'] = in_x0
+        return odg.generate_multiple_shape_optimisation_data(
+            in_representation, shape_list, 5,
+            step_args, {'maxiter': 2}, seed=1)
+
+    level_list = oc.generate_continuation_data(
+        run_level, cr.AzimuthRepresentation(3, 2), 3, 0.3)
+    assert [len(_.opt_data[-1].data) for _ in level_list] == [3, 12, 24]
+    assert x0_list[0] is None
+    times = [_.time for cur_level in level_list for _ in cur_level.opt_data]
+    assert times == sorted(times)
+
+
+def test_refinement_only_between_levels(monkeypatch):
+    """only the levels followed by another level are refined"""
+    refinement_list = []
+    get_refined_representation = oc.get_refined_representation
+
+    def counting_refinement(*args):
+        refinement_list.append(args)
+        return get_refined_representation(*args)
+    monkeypatch.setattr(
+        oc, 'get_refined_representation', counting_refinement)
+    representation = cr.AzimuthRepresentation(3, 2)
+    level_list = oc.generate_continuation_data(
+        lambda in_representation, *_: [odg.RowType(
+            numpy.zeros(len(in_representation.bounds)), 1.0)],
+        representation, 2, 0.3)
+    assert len(level_list) == 2
+    assert level_list[0].representation is representation
+    assert len(refinement_list) == 1
@@ -0,0 +1,288 @@
+"""tests for the module optimisation_data_generators"""
+import numpy
+import pytest
+
+import optimisation_data_generators as odg
+import optimisation_trajectory as ot
+import curve_representations as cr
+import convex_shapes
+import testing_shapes as ts
+
+
+def _get_example_representation():
+    return cr.AzimuthRepresentation(4, 2)
+
+
+def _get_example_shape_list():
+    return [convex_shapes.Wheel((0, 0), 1), convex_shapes.Wheel((0.1, 0), 1)]
+
+
+def _check_eval_counts(in_opt_data):
+    eval_counts = [_.eval_count for _ in in_opt_data]
+    assert eval_counts[0] > 0
+    assert all(_a <= _b for (_a, _b) in zip(eval_counts, eval_counts[1:]))
+
+
+def test_single_shape_rows():
+    """the rows contain the values of the objective"""
+    example_shape = convex_shapes.Wheel((0, 0), 1)
+    opt_data = odg.generate_single_shape_optimisation_data(
+        _get_example_representation(), example_shape, 5,
+        maxiter=2, seed=1)
+    for cur_row in opt_data:
+        assert numpy.isclose(
+            cur_row.value,
+            _get_example_representation().to_curve(
+                cur_row.data).get_max_len_inside(example_shape))
+        assert cur_row.result is None
+    _check_eval_counts(opt_data)
+
+
+def test_multiple_shape_rows():
+    """the rows contain the results of the evaluation"""
+    opt_data = odg.generate_multiple_shape_optimisation_data(
+        _get_example_representation(), _get_example_shape_list(), 5,
+        {'maxiter': 2, 'seed': 1}, {'maxiter': 2, 'seed': 2},
+        cache_capacity=100)
+    for cur_row in opt_data:
+        assert cur_row.value in (cur_row.result.sum, cur_row.result.max)
+        assert len(cur_row.result.len_array) == len(_get_example_shape_list())
+    assert opt_data[-1].value == opt_data[-1].result.max
+    _check_eval_counts(opt_data)
+
+
+def test_multiple_shape_unknown_option():
+    """the misspelt options are rejected"""
+    with pytest.raises(TypeError):
+        odg.generate_multiple_shape_optimisation_data(
+            _get_example_representation(), _get_example_shape_list(), 5,
+            {'maxiter': 2}, {'maxiter': 2}, eval_limt=10)
+
+
+def test_multistart():
+    """test of the function generate_multistart_optimisation_data"""
+    chain_num = 3
+    multistart_res = odg.generate_multistart_optimisation_data(
+        odg.generate_multiple_shape_optimisation_data, chain_num,
+        _get_example_representation(), _get_example_shape_list(), 5,
+        {'maxiter': 2}, {'maxiter': 2},
+        seed=4, max_workers=2)
+    assert len(multistart_res.chain_data_list) == chain_num
+    assert multistart_res.best_data[-1].value == \
+        multistart_res.best_data[-1].result.max == \
+        min(_[-1].value for _ in multistart_res.chain_data_list)
+    assert len(multistart_res.merged_data) == \
+        sum(len(_) for _ in multistart_res.chain_data_list)
+    merged_times = [_.time for _ in multistart_res.merged_data]
+    assert merged_times == sorted(merged_times)
+
+
+def test_multistart_stopped_in_sum_step():
+    """the chains stopped in the sum step are compared by their max"""
+    multistart_res = odg.generate_multistart_optimisation_data(
+        odg.generate_multiple_shape_optimisation_data, 3,
+        _get_example_representation(), _get_example_shape_list(), 5,
+        {}, {}, seed=4, max_workers=2, eval_limit=10)
+    for cur_data in multistart_res.chain_data_list:
+        assert cur_data[-1].value == cur_data[-1].result.sum
+    assert odg.get_final_value(multistart_res.best_data) == \
+        min(_[-1].result.max for _ in multistart_res.chain_data_list)
+
+
+def test_multistart_checkpoint(tmp_path):
+    """every chain of a multistart is resumed from its own checkpoint"""
+    def generate_data():
+        return odg.generate_multistart_optimisation_data(
+            odg.generate_multiple_shape_optimisation_data, 3,
+            _get_example_representation(), _get_example_shape_list(), 5,
+            {'maxiter': 2}, {'maxiter': 2},
+            seed=4, max_workers=2,
+            checkpoint=odg.Checkpoint(tmp_path/'run.pkl', 0.0))
+    chain_data_list = generate_data().chain_data_list
+    assert sorted(_.name for _ in tmp_path.iterdir()) == \
+        ['run_0.pkl', 'run_1.pkl', 'run_2.pkl']
+    assert [[_.value for _ in cur_data] for cur_data in chain_data_list] == \
+        [[_.value for _ in cur_data]
+         for cur_data in generate_data().chain_data_list]
+
+
+def test_multistart_sink(tmp_path):
+    """the chains of a multistart can not write to a single sink"""
+    with pytest.raises(ValueError):
+        odg.generate_multistart_optimisation_data(
+            odg.generate_multiple_shape_optimisation_data, 2,
+            _get_example_representation(), _get_example_shape_list(), 5,
+            {'maxiter': 2}, {'maxiter': 2},
+            sink=ot.Trajectory(tmp_path/'run.traj'))
+
+
+class _InterruptedCheckpoint(odg.Checkpoint):
+    """checkpoint interrupting the run after given number of saves"""
+    def __init__(self, in_path, in_save_limit):
+        super().__init__(in_path, 0.0)
+        self._save_limit = in_save_limit
+
+    def save(self, in_state):
+        super().save(in_state)
+        self._save_limit -= 1
+        if self._save_limit == 0:
+            raise KeyboardInterrupt
+
+
+def _generate_example_data(in_checkpoint):
+    return odg.generate_multiple_shape_optimisation_data(
+        _get_example_representation(), _get_example_shape_list(), 5,
+        {'maxiter': 2, 'maxfun': 300}, {'maxiter': 2},
+        seed=3, checkpoint=in_checkpoint)
+
+
+def test_resume_from_checkpoint(tmp_path):
+    """the interrupted run continues from the saved state"""
+    checkpoint_path = tmp_path/'run.pkl'
+    try:
+        _generate_example_data(_InterruptedCheckpoint(checkpoint_path, 50))
+    except KeyboardInterrupt:
+        pass
+    saved_state = odg.Checkpoint(checkpoint_path).load()
+    assert saved_state['finished_step_num'] == 0
+    assert saved_state['step_eval_count'] > 0
+
+    opt_data = _generate_example_data(odg.Checkpoint(checkpoint_path))
+    saved_rows = saved_state['opt_data']
+    assert len(opt_data) > len(saved_rows)
+    for (cur_row, saved_row) in zip(opt_data, saved_rows):
+        assert numpy.array_equal(cur_row.data, saved_row.data)
+    assert opt_data[len(saved_rows)].eval_count > saved_state['eval_count']
+    assert opt_data[-1].value == opt_data[-1].result.max
+    _check_eval_counts(opt_data)
+
+    resumed_data = _generate_example_data(odg.Checkpoint(checkpoint_path))
+    assert [_.value for _ in resumed_data] == [_.value for _ in opt_data]
+
+
+def test_checkpoint_of_different_problem(tmp_path):
+    """the checkpoint of a different problem is not resumed"""
+    checkpoint_path = tmp_path/'run.pkl'
+    _generate_example_data(odg.Checkpoint(checkpoint_path))
+    with pytest.raises(ValueError):
+        odg.generate_multiple_shape_optimisation_data(
+            _get_example_representation(), _get_example_shape_list()[:1], 5,
+            {'maxiter': 2, 'maxfun': 300}, {'maxiter': 2},
+            seed=3, checkpoint=odg.Checkpoint(checkpoint_path))
+
+
+def test_sink(tmp_path):
+    """the rows are written to the given sink"""
+    trajectory = ot.Trajectory(tmp_path/'run.traj')
+    opt_data = odg.generate_single_shape_optimisation_data(
+        _get_example_representation(), convex_shapes.Wheel((0, 0), 1), 5,
+        maxiter=2, seed=1, sink=trajectory)
+    assert opt_data is trajectory
+    assert len(opt_data) > 0
+    _check_eval_counts(opt_data)
+
+
+@pytest.mark.parametrize(
+    'in_backend_args',
+    [{'backend': 'dual_annealing', 'maxiter': 2},
+     {'backend': 'differential_evolution', 'maxiter': 2, 'popsize': 3},
+     {'backend': 'cma_es', 'maxiter': 5}])
+def test_backends(in_backend_args):
+    """every backend produces the rows of decreasing values"""
+    opt_data = odg.generate_multiple_shape_optimisation_data(
+        _get_example_representation(), _get_example_shape_list(), 5,
+        in_backend_args, in_backend_args, seed=2)
+    for cur_row in opt_data:
+        assert cur_row.value in (cur_row.result.sum, cur_row.result.max)
+    assert opt_data[-1].value == opt_data[-1].result.max
+    _check_eval_counts(opt_data)
+
+
+def test_eval_limit():
+    """the run stops after reaching the evaluation limit"""
+    eval_limit = 30
+    opt_data = odg.generate_multiple_shape_optimisation_data(
+        _get_example_representation(), _get_example_shape_list(), 5,
+        {}, {}, seed=1, eval_limit=eval_limit)
+    assert opt_data[-1].eval_count == eval_limit
+    assert opt_data[-1].value == opt_data[-1].result.sum
+    _check_eval_counts(opt_data)
+
+
+def test_time_limit():
+    """the run stops after reaching the time limit"""
+    opt_data = odg.generate_single_shape_optimisation_data(
+        _get_example_representation(), convex_shapes.Wheel((0, 0), 1), 5,
+        seed=1, time_limit=0.2)
+    assert opt_data[-1].time < 1
+
+
+def test_stagnation_limit():
+    """the steps stop when their best value stagnates"""
+    stagnation_limit = 20
+    opt_data = odg.generate_multiple_shape_optimisation_data(
+        _get_example_representation(), _get_example_shape_list(), 5,
+        {'backend': 'cma_es'}, {'backend': 'cma_es'},
+        seed=1, stagnation_limit=stagnation_limit)
+    assert opt_data[-1].value == opt_data[-1].result.max
+    assert opt_data[-1].eval_count < 1000
+    _check_eval_counts(opt_data)
+
+
+def test_precision_schedule_levels():
+    """the level grows with the progress and after the stagnation"""
+    schedule = odg.PrecisionSchedule([2, 4, 8], 10)
+    assert schedule.get_level(0, 0.1, 0) == 0
+    assert schedule.get_level(0, 0.5, 0) == 1
+    assert schedule.get_level(0, 0.1, 10) == 1
+    assert schedule.get_level(1, 0.1, 0) == 1
+    assert schedule.get_level(2, 0.9, 10) == 2
+
+
+def test_precision_schedule():
+    """the result of the step is re-scored with the finest precision"""
+    example_shape = ts.WheelWithoutProtocols((0, 0), 1)
+    opt_data = odg.generate_single_shape_optimisation_data(
+        _get_example_representation(), example_shape, 30,
+        maxiter=5, maxfun=200, seed=1,
+        precision_schedule=odg.PrecisionSchedule([1, 3, 30], 50))
+    exact_values = [
+        _get_example_representation().to_curve(
+            _.data).get_max_len_inside(example_shape, 30)
+        for _ in opt_data]
+    assert opt_data[-1].value == pytest.approx(exact_values[-1])
+    assert exact_values[-1] == pytest.approx(min(exact_values))
+
+
+def test_use_gradient():
+    """the gradient reduces the evaluations of the local searches"""
+    opt_data_list = [
+        odg.generate_multiple_shape_optimisation_data(
+            _get_example_representation(), _get_example_shape_list(), 5,
+            {'maxiter': 2}, {'maxiter': 2},
+            seed=1, use_gradient=use_gradient)
+        for use_gradient in (False, True)]
+    for opt_data in opt_data_list:
+        assert opt_data[-1].value == opt_data[-1].result.max
+        _check_eval_counts(opt_data)
+    assert opt_data_list[1][-1].eval_count < opt_data_list[0][-1].eval_count
+
+
+def test_incremental():
+    """the incremental evaluations do not change the optimisation data"""
+    opt_data_list = [
+        odg.generate_multiple_shape_optimisation_data(
+            cr.PointCurveRepresentation(8, -1.5, 1.5),
+            _get_example_shape_list(), 5,
+            {'maxiter': 2}, {'maxiter': 2},
+            seed=1, incremental=incremental)
+        for incremental in (False, True)]
+    assert [_.value for _ in opt_data_list[0]] == \
+        [_.value for _ in opt_data_list[1]]
+    single_opt_data = odg.generate_single_shape_optimisation_data(
+        _get_example_representation(), convex_shapes.Wheel((0, 0), 1), 5,
+        maxiter=2, seed=1, incremental=True)
+    assert [_.value for _ in single_opt_data] == [
+        _.value for _ in odg.generate_single_shape_optimisation_data(
+            _get_example_representation(), convex_shapes.Wheel((0, 0), 1), 5,
+            maxiter=2, seed=1)]
@@ -0,0 +1,52 @@
+"""tests for the module optimisation_result_store"""
+import numpy
+
+import optimisation_data_generators as odg
+import optimisation_result_store as ors
+import curve_representations as cr
+import convex_shapes
+
+
+def _get_counting_generator(in_call_list):
+    def generator_fun(*args, **kwargs):
+        in_call_list.append((args, kwargs))
+        return odg.generate_multiple_shape_optimisation_data(*args, **kwargs)
+    return generator_fun
+
+
+def _get_example_args(in_radius):
+    return (
+        cr.AzimuthRepresentation(4, 2),
+        [convex_shapes.Wheel((0, 0), in_radius),
+         convex_shapes.Wheel((0.1, 0), 1)],
+        5, {'maxiter': 2}, {'maxiter': 2})
+
+
+def test_generate(tmp_path):
+    """the stored data is returned for the same problem"""
+    call_list = []
+    generator_fun = _get_counting_generator(call_list)
+    result_store = ors.ResultStore(tmp_path)
+    first_res = result_store.generate(
+        generator_fun, *_get_example_args(1), seed=3)
+    second_res = ors.ResultStore(tmp_path).generate(
+        generator_fun, *_get_example_args(1), seed=3)
+    assert len(call_list) == 1
+    assert len(first_res) == len(second_res)
+    for (row_a, row_b) in zip(first_res, second_res):
+        assert numpy.array_equal(row_a.data, row_b.data)
+        assert (row_a.time, row_a.value, row_a.eval_count) == \
+            (row_b.time, row_b.value, row_b.eval_count)
+        assert numpy.array_equal(row_a.result.len_array, row_b.result.len_array)
+        assert row_a.result[1:] == row_b.result[1:]
+
+
+def test_key_depends_on_problem():
+    """changes of the arguments change the key"""
+    def get_key(in_radius, **kwargs):
+        return ors.ResultStore.get_key(ors.ResultStore.get_description(
+            odg.generate_multiple_shape_optimisation_data,
+            *_get_example_args(in_radius), **kwargs))
+    assert get_key(1) == get_key(1)
+    assert get_key(1) != get_key(1.5)
+    assert get_key(1, seed=1) != get_key(1, seed=2)
@@ -0,0 +1,61 @@
+"""tests for the module optimisation_trajectory"""
+import pickle
+import numpy
+import pytest
+
+import optimisation_trajectory as ot
+import optimisation_data_generators as odg
+import evaluators as ev
+
+
+def _get_example_row(in_num, in_with_result):
+    result = None
+    if in_with_result:
+        result = ev.get_evaluation_result(
+            numpy.array([in_num, 2*in_num+1.0]), 0.05)
+    return odg.RowType(
+        numpy.array([in_num, -in_num, 0.5]), 0.1*in_num,
+        None if in_num == 0 else float(in_num), result, 3*in_num)
+
+
+def _check_rows(in_row_a, in_row_b):
+    assert numpy.array_equal(in_row_a.data, in_row_b.data)
+    assert (in_row_a.time, in_row_a.value, in_row_a.eval_count) == \
+        (in_row_b.time, in_row_b.value, in_row_b.eval_count)
+    if in_row_a.result is None:
+        assert in_row_b.result is None
+    else:
+        assert numpy.array_equal(
+            in_row_a.result.len_array, in_row_b.result.len_array)
+        assert in_row_a.result[1:] == in_row_b.result[1:]
+
+
+@pytest.mark.parametrize('in_with_result', [False, True])
+def test_append_and_read(tmp_path, in_with_result):
+    """the appended rows are read back after the file grows"""
+    row_list = [_get_example_row(_, in_with_result) for _ in range(40)]
+    trajectory = ot.Trajectory(tmp_path/'example.traj')
+    assert len(trajectory) == 0
+    for _ in row_list:
+        trajectory.append(_)
+    reopened = ot.Trajectory(tmp_path/'example.traj')
+    assert len(reopened) == len(row_list)
+    for (row_a, row_b) in zip(row_list, reopened):
+        _check_rows(row_a, row_b)
+    _check_rows(reopened[-1], row_list[-1])
+    assert len(reopened[5:10]) == 5
+    with pytest.raises(IndexError):
+        _ = reopened[len(row_list)]
+
+
+def test_pickle_truncates(tmp_path):
+    """the unpickled trajectory contains only the pickled rows"""
+    trajectory = ot.Trajectory(tmp_path/'example.traj')
+    for _ in range(3):
+        trajectory.append(_get_example_row(_, True))
+    pickled = pickle.dumps(trajectory)
+    trajectory.append(_get_example_row(3, True))
+    unpickled = pickle.loads(pickled)
+    assert len(unpickled) == 3
+    unpickled.append(_get_example_row(4, True))
+    _check_rows(unpickled[-1], _get_example_row(4, True))
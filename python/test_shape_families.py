@@ -0,0 +1,140 @@
+"""tests for the module shape_families"""
+import numpy
+import pytest
+
+import convex_shapes
+import curve_representations as cr
+import escape_curve
+import rotations
+import shape_families as sf
+
+
+def _get_example_family():
+    angles = numpy.linspace(0, 2*numpy.pi, 7, endpoint=False)
+    shifts = numpy.random.default_rng(5).uniform(-0.2, 0.2, (len(angles), 2))
+    return sf.ShapeFamily(convex_shapes.Wheel([0.3, 0.1], 1.1), angles, shifts)
+
+
+def _get_explicit_members(in_family):
+    return [
+        convex_shapes.Wheel(
+            rotations.rotate_2d(numpy.array([0.3, 0.1]), cur_angle) +
+            cur_shift, 1.1)
+        for (cur_angle, cur_shift) in zip(in_family.angles, in_family.shifts)]
+
+
+def _get_example_data_matrix():
+    return numpy.random.default_rng(7).uniform(-numpy.pi, numpy.pi, (4, 6))
+
+
+def test_member_frames_of_origin():
+    """the origin is inside of all of the members"""
+    assert _get_example_family().contains_many(numpy.zeros((1, 2))).all()
+
+
+@pytest.mark.parametrize("cur_data", _get_example_data_matrix())
+def test_get_max_len_inside_array(cur_data):
+    """the lengths inside the members agree with the explicit shapes"""
+    example_family = _get_example_family()
+    example_curve = cr.LogoRepresentation(6, 3).to_curve(cur_data)
+    assert numpy.allclose(
+        example_family.get_max_len_inside_array(example_curve.point_list),
+        [example_curve.get_max_len_inside(_)
+         for _ in _get_explicit_members(example_family)])
+
+
+def test_get_max_len_inside_array_batch():
+    """the batch evaluation agrees with the single curve evaluation"""
+    example_family = _get_example_family()
+    point_array = cr.AzimuthRepresentation(6, 3).to_curves_batch(
+        _get_example_data_matrix())
+    batch_res = example_family.get_max_len_inside_array(point_array)
+    assert batch_res.shape == (len(point_array), len(example_family))
+    for (cur_points, cur_res) in zip(point_array, batch_res):
+        assert numpy.allclose(
+            cur_res,
+            escape_curve.get_max_len_inside_batch(
+                example_family.to_member_frames(cur_points),
+                example_family.base_shape))
+
+
+_BIG_SIZE = 1000
+_LEN_LIMIT = 50
+
+
+def _get_slab_example_angles():
+    return numpy.linspace(0, 2*numpy.pi, 13, endpoint=False)
+
+
+def test_halfplane_family():
+    """the lengths inside half-planes agree with huge rectangles"""
+    offset = 0.7
+    halfplane_family = sf.HalfplaneFamily(
+        _get_slab_example_angles(), offset, _LEN_LIMIT)
+    rectangle_family = sf.ShapeFamily(
+        convex_shapes.Rectangle(
+            [offset-_BIG_SIZE/2, 0], _BIG_SIZE, _BIG_SIZE),
+        _get_slab_example_angles())
+    point_array = cr.AzimuthRepresentation(6, 3).to_curves_batch(
+        _get_example_data_matrix())
+    assert numpy.allclose(
+        halfplane_family.get_max_len_inside_array(point_array),
+        numpy.minimum(
+            rectangle_family.get_max_len_inside_array(point_array),
+            _LEN_LIMIT))
+    assert (halfplane_family.contains_many(point_array) ==
+            rectangle_family.contains_many(point_array)).all()
+
+
+def test_strip_family():
+    """the lengths inside strips agree with long rectangles"""
+    width = 0.9
+    shifts = [-0.3, 0, 0.2]
+    strip_family = sf.StripFamily(
+        _get_slab_example_angles(), shifts, width, _LEN_LIMIT)
+    rectangle_list = [
+        sf.ShapeFamily(
+            convex_shapes.Rectangle([_, 0], width, _BIG_SIZE), [cur_angle])
+        for cur_angle in _get_slab_example_angles() for _ in shifts]
+    point_array = cr.LogoRepresentation(6, 3).to_curves_batch(
+        _get_example_data_matrix())
+    assert numpy.allclose(
+        strip_family.get_max_len_inside_array(point_array),
+        numpy.minimum(
+            numpy.concatenate(
+                [_.get_max_len_inside_array(point_array)
+                 for _ in rectangle_list], axis=-1),
+            _LEN_LIMIT))
+    assert (strip_family.contains_many(point_array) ==
+            numpy.concatenate(
+                [_.contains_many(point_array) for _ in rectangle_list],
+                axis=-2)).all()
+
+
+@pytest.mark.parametrize(
+    "example_family",
+    [_get_example_family(),
+     sf.ShapeFamily(
+         convex_shapes.Rectangle([0.2, 0], 3, 1), _get_slab_example_angles()),
+     sf.HalfplaneFamily(_get_slab_example_angles(), 0.7, _LEN_LIMIT),
+     sf.StripFamily(_get_slab_example_angles(), [-0.3, 0.2], 0.9, 2)])
+def test_get_max_len_inside_and_grad(example_family):
+    """the gradients in the members agree with the finite differences"""
+    point_array = cr.AzimuthRepresentation(6, 3).to_curves_batch(
+        _get_example_data_matrix())[0]
+    len_array = example_family.get_max_len_inside_array(point_array)
+    step = 1e-6
+    for member_num in range(len(example_family)):
+        res_len, res_grad = example_family.get_max_len_inside_and_grad(
+            point_array, member_num)
+        assert numpy.isclose(res_len, len_array[member_num])
+        numerical_grad = numpy.zeros_like(point_array)
+        for ind in numpy.ndindex(point_array.shape):
+            shift = numpy.zeros_like(point_array)
+            shift[ind] = step
+            numerical_grad[ind] = (
+                example_family.get_max_len_inside_array(
+                    point_array+shift)[member_num] -
+                example_family.get_max_len_inside_array(
+                    point_array-shift)[member_num])/(2*step)
+        assert numpy.allclose(res_grad, numerical_grad, atol=1e-5)
@@ -0,0 +1,21 @@
+"""contains the shapes used in the tests"""
+import convex_shapes
+
+
+class ShapeWithoutProtocols:  # pylint: disable=too-few-public-methods
+    """
+    wraps a shape providing only its membership test,
+    i.e. without contains_many, find_exit_parameter and get_outward_normals
+    """
+    def __init__(self, in_shape):
+        self._shape = in_shape
+
+    def __contains__(self, in_pos):
+        return in_pos in self._shape
+
+
+class WheelWithoutProtocols(ShapeWithoutProtocols):
+    # pylint: disable=too-few-public-methods
+    """wheel providing only the membership test"""
+    def __init__(self, in_center, in_radius):
+        super().__init__(convex_shapes.Wheel(in_center, in_radius))